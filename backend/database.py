@@ -44,5 +44,6 @@ def get_storage_bucket():
     """Get Firebase Storage bucket"""
     return storage.bucket()
 
-# Get Firestore client
+# Get Firestore client. This is the single process-wide client: every service imports
+# this `db`, so they all share one set of credentials and one gRPC channel.
 db = initialize_firebase()
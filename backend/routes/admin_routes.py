@@ -17,7 +17,7 @@ from ..services.locker_service import get_available_lockers
 from ..services.found_item_service import get_dashboard_statistics, get_recent_activities, create_found_item
 from ..services.image_service import generate_tags
 from ..services.status_service import update_overdue_items, validate_status_transition, is_status_final
-from ..services.admin_review_service import create_admin_review, get_admin_reviews, get_admin_review_by_id
+from ..services.admin_review_service import create_admin_review, get_admin_reviews, get_admin_review_by_id, iter_admin_reviews, reindex_admin_reviews
 from ..services.claim_service import validate_admin_status_for_approval  # Validate admin before approving/rejecting
 
 admin_bp = Blueprint('admin', __name__, url_prefix='/admin')
@@ -4016,6 +4016,10 @@ def get_admin_reviews_api():
         sort_by = request.args.get('sort_by', '').strip()
         sort_order = request.args.get('sort_order', 'asc').strip()
         
+        # include_total=false skips counting every match: the scan stops once the page is
+        # filled, total_items is null and has_more drives the pager
+        include_total = request.args.get('include_total', 'true').strip().lower() not in ('0', 'false', 'no', 'off')
+        
         # Calculate offset
         offset = (page - 1) * per_page
         
@@ -4026,7 +4030,8 @@ def get_admin_reviews_api():
             search=search, 
             status_filter=status_filter,
             sort_by=sort_by,
-            sort_order=sort_order
+            sort_order=sort_order,
+            exact_count=include_total
         )
         
         if result['success']:
@@ -4037,7 +4042,8 @@ def get_admin_reviews_api():
                 'pagination': {
                     'current_page': page,
                     'per_page': per_page,
-                    'total_items': result['count']
+                    'total_items': result['count'] if include_total else None,
+                    'has_more': result.get('has_more', False)
                 }
             }), 200
         else:
@@ -4049,6 +4055,73 @@ def get_admin_reviews_api():
     except Exception as e:
         return jsonify({'error': f'Server error: {str(e)}'}), 500
 
+@admin_bp.route('/api/admin-reviews/stream', methods=['GET'])
+def stream_admin_reviews_api():
+    """API endpoint that streams admin reviews as a JSON array, newest first"""
+    if not is_admin():
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    try:
+        limit = request.args.get('limit', type=int)
+        offset = request.args.get('offset', 0, type=int)
+        search = request.args.get('search', '').strip()
+        status_filter = request.args.get('status', '').strip()
+        found_item_id = request.args.get('found_item_id', '').strip()
+    except Exception as e:
+        return jsonify({'error': f'Invalid parameters: {str(e)}'}), 400
+    
+    reviews = iter_admin_reviews(
+        limit=limit,
+        offset=offset,
+        found_item_id=found_item_id or None,
+        search=search or None,
+        status_filter=status_filter or None
+    )
+    # Run the query and fetch the first review before the response starts, so query
+    # errors still get a 500 instead of a truncated 200 body
+    try:
+        first_review = next(reviews, None)
+    except Exception as e:
+        print(f"Error in stream_admin_reviews_api: {str(e)}")
+        return jsonify({'error': f'Failed to stream admin reviews: {str(e)}'}), 500
+    
+    def gen():
+        # Serialize one review at a time so memory does not grow with the result size
+        yield '['
+        try:
+            if first_review is not None:
+                yield json.dumps(first_review, default=str)
+                for review in reviews:
+                    yield ',' + json.dumps(review, default=str)
+        except Exception as e:
+            # Headers are already sent; close the array so the body stays valid JSON
+            print(f"Error while streaming admin reviews: {str(e)}")
+        yield ']'
+    
+    return Response(stream_with_context(gen()), mimetype='application/json')
+
+@admin_bp.route('/api/admin-reviews/reindex', methods=['POST'])
+def reindex_admin_reviews_api():
+    """API endpoint to backfill the admin review search index and enable index-backed search"""
+    if not is_admin():
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    try:
+        result = reindex_admin_reviews()
+        if result['success']:
+            return jsonify({
+                'success': True,
+                'indexed': result['indexed']
+            }), 200
+        else:
+            return jsonify({
+                'success': False,
+                'error': result['error']
+            }), 500
+    
+    except Exception as e:
+        return jsonify({'error': f'Server error: {str(e)}'}), 500
+
 @admin_bp.route('/api/admin-reviews/<review_id>', methods=['GET'])
 def get_admin_review_api(review_id):
     """API endpoint to get a specific admin review"""
@@ -10,6 +10,8 @@ from ..services.found_item_service import get_found_item_details
 from ..services.claim_service import (
     start_claim,
     save_face_image_for_claim,
+    save_face_image_for_claim_raw,
+    FACE_UPLOAD_MAX_BYTES,
     set_verification_method,
     generate_claim_qr,
     finalize_claim,
@@ -37,14 +39,14 @@ def get_notification_count():
         if not user_id:
             return jsonify({'error': 'User not found'}), 401
         
-        # Query notifications collection for unread notifications for current user
+        # Count unread notifications server-side; an aggregation is billed per 1000 index
+        # entries instead of one read per notification document
         notifications_ref = db.collection('notifications')
         query = notifications_ref.where('user_id', '==', user_id).where('is_read', '==', False)
-        unread_notifications = list(query.stream())
-        if not unread_notifications:
+        count = query.count().get()[0][0].value
+        if not count:
             legacy_q = notifications_ref.where('recipient_id', '==', user_id).where('read', '==', False)
-            unread_notifications = list(legacy_q.stream())
-        count = len(unread_notifications)
+            count = legacy_q.count().get()[0][0].value
         
         return jsonify({
             'success': True,
@@ -81,9 +83,8 @@ def list_notifications():
                    .order_by('timestamp', direction=firestore.Query.DESCENDING)
                    .limit(limit)
             )
-            docs = list(q.stream())
+            rows = [(d.id, d.to_dict() or {}) for d in q.stream()]
         except Exception:
-            docs = list(ref.where('user_id', '==', user_id).stream())
             def _safe_ts(v):
                 try:
                     if hasattr(v, 'timestamp'):
@@ -91,14 +92,20 @@ def list_notifications():
                     return datetime.fromisoformat(v).timestamp()
                 except Exception:
                     return 0
-            docs = [d for d in docs if _safe_ts((d.to_dict() or {}).get('timestamp')) >= since.timestamp()]
-            docs.sort(key=lambda d: _safe_ts((d.to_dict() or {}).get('timestamp')), reverse=True)
-            docs = docs[:limit]
-
-        for d in docs:
-            data = d.to_dict() or {}
+            # Deserialize and parse each timestamp once, then filter and sort on the parsed value
+            since_ts = since.timestamp()
+            parsed = []
+            for d in ref.where('user_id', '==', user_id).stream():
+                data = d.to_dict() or {}
+                ts = _safe_ts(data.get('timestamp'))
+                if ts >= since_ts:
+                    parsed.append((ts, d.id, data))
+            parsed.sort(key=lambda r: r[0], reverse=True)
+            rows = [(doc_id, data) for _, doc_id, data in parsed[:limit]]
+
+        for doc_id, data in rows:
             items.append({
-                'notificationId': data.get('notification_id', d.id),
+                'notificationId': data.get('notification_id', doc_id),
                 'userId': data.get('user_id'),
                 'title': data.get('title'),
                 'message': data.get('message'),
@@ -120,12 +127,14 @@ def mark_all_notifications_read():
         if not user_id:
             return jsonify({'error': 'User not found'}), 401
         ref = db.collection('notifications')
-        q = ref.where('user_id', '==', user_id).where('is_read', '==', False)
+        # Only the references are needed; an empty projection skips the notification bodies
+        q = ref.where('user_id', '==', user_id).where('is_read', '==', False).select([])
         docs = list(q.stream())
-        batch = db.batch()
-        for d in docs:
-            batch.update(ref.document(d.id), {'is_read': True})
-        if docs:
+        # Firestore accepts at most 500 writes per commit
+        for start in range(0, len(docs), 500):
+            batch = db.batch()
+            for d in docs[start:start + 500]:
+                batch.update(d.reference, {'is_read': True})
             batch.commit()
         return jsonify({'success': True, 'updated': len(docs)}), 200
     except Exception as e:
@@ -759,7 +768,9 @@ def user_capture_face_api():
             current_app.logger.info('capture-face: claim_id=%s, data_url_len=%d', claim_id, len(face_data_url or ''))
         except Exception:
             pass
-        success, resp, status = save_face_image_for_claim(claim_id, face_data_url, upload_folder)
+        # Optional: store the chosen verification method in the same write as the face data
+        method = data.get('method') or None
+        success, resp, status = save_face_image_for_claim(claim_id, face_data_url, upload_folder, verification_method=method)
         try:
             current_app.logger.info('capture-face: status=%s, resp_keys=%s', status, list(resp.keys()))
         except Exception:
@@ -768,6 +779,29 @@ def user_capture_face_api():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@user_bp.route('/api/claims/capture-face-upload', methods=['POST'])
+def user_capture_face_upload_api():
+    """Multipart variant of capture-face: form field claim_id plus file field face_image."""
+    try:
+        if not is_student():
+            return jsonify({'error': 'Unauthorized'}), 401
+        # Reject oversized bodies before the multipart form is parsed
+        if request.content_length and request.content_length > FACE_UPLOAD_MAX_BYTES + 64 * 1024:
+            return jsonify({'error': 'Image too large (max 2MB)'}), 413
+        claim_id = request.form.get('claim_id')
+        face_file = request.files.get('face_image')
+        if not claim_id or not face_file:
+            return jsonify({'error': 'Missing claim_id or face_image'}), 400
+        # Read one byte past the cap so the service can reject the oversized file
+        img_bytes = face_file.read(FACE_UPLOAD_MAX_BYTES + 1)
+        method = request.form.get('method') or None
+        success, resp, status = save_face_image_for_claim_raw(
+            claim_id, img_bytes, session.get('user_id'), verification_method=method
+        )
+        return jsonify(resp), status
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @user_bp.route('/api/claims/select-method', methods=['POST'])
 def user_select_verification_method_api():
     try:
@@ -929,7 +963,10 @@ def user_list_claims_api():
         start_date = request.args.get('start', type=str)
         end_date = request.args.get('end', type=str)
         page_size = request.args.get('page_size', default=20, type=int)
-        cursor_id = request.args.get('cursor', type=str)
+        # Keyset pagination only: pass back pagination.next_cursor_id from the previous page
+        if 'offset' in request.args or 'page' in request.args:
+            return jsonify({'error': 'offset/page pagination is not supported; use cursor', 'code': 'CURSOR_REQUIRED'}), 400
+        cursor_id = request.args.get('cursor', type=str) or request.args.get('start_after_claim_id', type=str)
 
         ok, resp, status_code = list_user_claims(
             student_id,
@@ -143,8 +143,7 @@ def verify_face_api():
                 if isinstance(reps, list) and len(reps) > 0 and isinstance(reps[0], dict):
                     vec = reps[0].get('embedding') or reps[0].get('facial_embedding')
                     if isinstance(vec, (list, tuple, np.ndarray)):
-                        v = vec.tolist() if isinstance(vec, np.ndarray) else list(vec)
-                        computed_embeddings.append(('deepface_facenet512', [round(float(x), 6) for x in v]))
+                        computed_embeddings.append(('deepface_facenet512', np.round(np.asarray(vec, dtype=np.float64), 6).tolist()))
             finally:
                 try:
                     os.remove(temp_path)
@@ -230,9 +229,8 @@ def verify_face_api():
                 buf = io.BytesIO(img_bytes)
                 img = Image.open(buf).convert('L')
                 img = img.resize((16, 16))
-                pixels = list(img.getdata())
-                max_val = 255.0
-                computed_embeddings.append(('pil_256', [round(p / max_val, 6) for p in pixels]))
+                pixels = np.asarray(img, dtype=np.uint8).ravel()
+                computed_embeddings.append(('pil_256', np.round(pixels / 255.0, 6).tolist()))
             except Exception as e:
                 return jsonify({'success': False, 'error': f'Failed to compute embedding: {str(e)}'}), 500
 
@@ -247,9 +245,17 @@ def verify_face_api():
             # Default to the first embedding if no dimension match; report mismatch
             chosen_label, chosen_vec = computed_embeddings[0]
 
+        # LBP embeddings captured since claims began storing raw histogram counts sum to the
+        # pixel count rather than 1; normalize them so L2 distances stay on the same scale.
+        stored_vec = list(stored_embedding)
+        if chosen_label == 'opencv_lbp256':
+            stored_total = float(sum(stored_vec))
+            if stored_total > 1.5:
+                stored_vec = [float(v) / stored_total for v in stored_vec]
+
         # Compare using face_recognition_service
         try:
-            match, score = is_match(chosen_vec, list(stored_embedding), method=method, threshold=threshold)
+            match, score = is_match(chosen_vec, stored_vec, method=method, threshold=threshold)
         except Exception as e:
             return jsonify({
                 'success': False,
@@ -3,31 +3,353 @@ Admin Review Service
 Handles admin review operations for overdue found items
 """
 
+import os
+import time
 import datetime
+import itertools
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from firebase_admin import firestore
+from google.cloud import firestore as gc_firestore
 from ..database import db
 
-def generate_admin_review_id():
-    """Generate a unique admin review ID"""
+# Firestore 'in' filters accept at most 30 values per query
+_IN_QUERY_CHUNK = 30
+# Parallelism for the per-document fallback when a batched query fails
+_FETCH_WORKERS = 16
+
+# Optional Typesense integration for admin review search.
+# Enabled only when the `typesense` package is installed and TYPESENSE_HOST/TYPESENSE_API_KEY are set;
+# otherwise search falls back to client-side filtering over Firestore results.
+# Searches are only delegated once the index holds every review: after reindex_admin_reviews()
+# has recorded a finished backfill in Firestore (shared by every worker, re-checked every
+# _SEARCH_READY_TTL_SECONDS), or when TYPESENSE_ADMIN_REVIEWS_READY=1 says a backfill already ran.
+_SEARCH_COLLECTION = 'admin_reviews'
+_SEARCH_IMPORT_BATCH = 500
+_SEARCH_READY_DOC = ('counters', 'admin_reviews_search')
+_SEARCH_READY_TTL_SECONDS = 60
+_search_ready_env = os.environ.get('TYPESENSE_ADMIN_REVIEWS_READY', '').strip().lower() in ('1', 'true', 'yes', 'on')
+_search_ready_cache = {'value': False, 'ts': None}
+_SEARCH_QUERY_BY = 'found_item_name,category,reviewer_name,notes,review_status,review_id'
+_SEARCH_CLIENT = None
+try:
+    import typesense
+    if os.environ.get('TYPESENSE_HOST') and os.environ.get('TYPESENSE_API_KEY'):
+        _SEARCH_CLIENT = typesense.Client({
+            'nodes': [{
+                'host': os.environ['TYPESENSE_HOST'],
+                'port': os.environ.get('TYPESENSE_PORT', '8108'),
+                'protocol': os.environ.get('TYPESENSE_PROTOCOL', 'http'),
+            }],
+            'api_key': os.environ['TYPESENSE_API_KEY'],
+            'connection_timeout_seconds': 2,
+        })
+except Exception:
+    _SEARCH_CLIENT = None
+
+_SEARCH_SCHEMA = {
+    'name': _SEARCH_COLLECTION,
+    'fields': [
+        {'name': 'review_id', 'type': 'string'},
+        {'name': 'found_item_id', 'type': 'string', 'facet': True},
+        {'name': 'found_item_name', 'type': 'string'},
+        {'name': 'category', 'type': 'string'},
+        {'name': 'reviewer_name', 'type': 'string'},
+        {'name': 'notes', 'type': 'string'},
+        {'name': 'review_status', 'type': 'string', 'facet': True},
+        {'name': 'review_date', 'type': 'int64'},
+    ],
+    'default_sorting_field': 'review_date',
+}
+
+# Short-lived cache of reviewer display fields: { user_id: {'data': dict, 'ts': float} }
+_reviewer_cache = {}
+_REVIEWER_CACHE_TTL_SECONDS = 300
+
+def _get_reviewer_fields(user_id):
+    """Return the reviewer's name and email, cached briefly since admins review in bursts"""
+    now = time.time()
+    cached = _reviewer_cache.get(user_id)
+    if cached and now - cached['ts'] < _REVIEWER_CACHE_TTL_SECONDS:
+        return cached['data']
+    data = _fetch_fields_by_ids('users', [user_id], ['name', 'email']).get(user_id, {})
+    _reviewer_cache[user_id] = {'data': data, 'ts': now}
+    return data
+
+def _fetch_fields_by_ids(collection_name, doc_ids, fields=None):
+    """
+    Batch-fetch documents by ID, projecting only the requested fields.
+
+    Returns:
+        dict: Mapping of document ID to a dict holding the projected fields
+    """
+    results = {}
+    ids = [i for i in set(doc_ids) if i]
+    for i in range(0, len(ids), _IN_QUERY_CHUNK):
+        chunk = ids[i:i + _IN_QUERY_CHUNK]
+        try:
+            query = db.collection(collection_name).where(firestore.FieldPath.document_id(), 'in', chunk)
+            if fields:
+                query = query.select(fields)
+            for snap in query.stream():
+                results[snap.id] = snap.to_dict() or {}
+        except Exception as e:
+            print(f"Error fetching {collection_name} data: {e}")
+            results.update(_fetch_docs_concurrently(collection_name, chunk))
+    return results
+
+def _fetch_docs_concurrently(collection_name, doc_ids):
+    """Fallback for when the batched query fails: issue per-document gets in parallel."""
+    collection_ref = db.collection(collection_name)
+
+    def _get(doc_id):
+        try:
+            return doc_id, collection_ref.document(doc_id).get()
+        except Exception as e:
+            print(f"Error fetching {collection_name}/{doc_id}: {e}")
+            return doc_id, None
+
+    results = {}
+    with ThreadPoolExecutor(max_workers=min(_FETCH_WORKERS, len(doc_ids)) or 1) as executor:
+        for doc_id, snap in executor.map(_get, doc_ids):
+            if snap is not None and snap.exists:
+                results[doc_id] = snap.to_dict() or {}
+    return results
+
+def _search_document(review_data, item_name, category, reviewer_name):
+    """Flatten a review into the search index document shape"""
+    review_date = review_data.get('review_date')
+    return {
+        'id': review_data['review_id'],
+        'review_id': review_data['review_id'],
+        'found_item_id': review_data.get('found_item_id') or '',
+        'found_item_name': item_name or 'Unknown Item',
+        'category': category or 'Unknown',
+        'reviewer_name': reviewer_name or 'Unknown Admin',
+        'notes': review_data.get('notes') or '',
+        'review_status': review_data.get('review_status') or '',
+        # Index the stored review timestamp so index order matches Firestore order
+        'review_date': int(review_date.timestamp()) if isinstance(review_date, datetime.datetime) else 0,
+    }
+
+def _index_review_for_search(review_data):
+    """Upsert a flattened copy of a review into the search index (no-op when search is not configured)."""
+    if _SEARCH_CLIENT is None:
+        return
     try:
-        # Get the latest review ID from Firestore
-        reviews_ref = db.collection('admin_reviews')
-        query = reviews_ref.order_by('review_id', direction=firestore.Query.DESCENDING).limit(1)
-        docs = query.stream()
-        
-        latest_id = "AR0000"
-        for doc in docs:
-            latest_id = doc.to_dict().get('review_id', 'AR0000')
-            break
-        
-        # Extract the numeric part and increment
-        if latest_id.startswith('AR'):
-            numeric_part = int(latest_id[2:])
-            new_numeric_part = numeric_part + 1
-            new_id = f"AR{new_numeric_part:04d}"
+        document = _search_document(
+            review_data,
+            review_data.get('item_name_snapshot'),
+            review_data.get('category_snapshot'),
+            review_data.get('reviewer_name_snapshot'),
+        )
+        documents = _SEARCH_CLIENT.collections[_SEARCH_COLLECTION].documents
+        try:
+            documents.upsert(document)
+        except typesense.exceptions.ObjectNotFound:
+            _SEARCH_CLIENT.collections.create(_SEARCH_SCHEMA)
+            documents.upsert(document)
+    except Exception as e:
+        print(f"Error indexing admin review for search: {e}")
+
+def _is_search_index_ready():
+    """Whether a finished backfill has been recorded, cached briefly so searches skip the read"""
+    if _search_ready_env:
+        return True
+    now = time.time()
+    cached_ts = _search_ready_cache['ts']
+    if cached_ts is not None and now - cached_ts < _SEARCH_READY_TTL_SECONDS:
+        return _search_ready_cache['value']
+    try:
+        snap = db.collection(_SEARCH_READY_DOC[0]).document(_SEARCH_READY_DOC[1]).get()
+        ready = bool(snap.exists and (snap.to_dict() or {}).get('index_ready'))
+    except Exception as e:
+        print(f"Error reading admin review search index state: {e}")
+        ready = False
+    _search_ready_cache.update(value=ready, ts=now)
+    return ready
+
+def reindex_admin_reviews():
+    """
+    Backfill the search index with every stored admin review, then record in Firestore that the
+    index is complete so every worker switches to index-backed search within
+    _SEARCH_READY_TTL_SECONDS. Run once after configuring Typesense.
+    
+    Returns:
+        dict: Result with success status and the number of reviews indexed
+    """
+    if _SEARCH_CLIENT is None:
+        return {'success': False, 'error': 'Search index is not configured', 'indexed': 0}
+    try:
+        try:
+            _SEARCH_CLIENT.collections[_SEARCH_COLLECTION].retrieve()
+        except typesense.exceptions.ObjectNotFound:
+            _SEARCH_CLIENT.collections.create(_SEARCH_SCHEMA)
+        documents = _SEARCH_CLIENT.collections[_SEARCH_COLLECTION].documents
+        
+        indexed = 0
+        batch = []
+        for review_data, item_name, category, _item_status, reviewer_name in _iter_review_rows(
+                db.collection('admin_reviews')):
+            if not review_data.get('review_id'):
+                continue
+            batch.append(_search_document(review_data, item_name, category, reviewer_name))
+            if len(batch) >= _SEARCH_IMPORT_BATCH:
+                documents.import_(batch, {'action': 'upsert'})
+                indexed += len(batch)
+                batch = []
+        if batch:
+            documents.import_(batch, {'action': 'upsert'})
+            indexed += len(batch)
+        
+        db.collection(_SEARCH_READY_DOC[0]).document(_SEARCH_READY_DOC[1]).set({
+            'index_ready': True,
+            'indexed': indexed,
+            'indexed_at': firestore.SERVER_TIMESTAMP,
+        }, merge=True)
+        _search_ready_cache.update(value=True, ts=time.time())
+        return {'success': True, 'indexed': indexed}
+    except Exception as e:
+        return {'success': False, 'error': f'Failed to reindex admin reviews: {str(e)}', 'indexed': 0}
+
+def _search_indexed_reviews(search, limit, offset, found_item_id=None):
+    """
+    Run a free-text review search against the search index.
+
+    Returns:
+        tuple | None: (ordered review IDs for the requested page, total match count),
+        or None when search is not configured or the index is unavailable
+    """
+    if _SEARCH_CLIENT is None or limit <= 0 or not _is_search_index_ready():
+        return None
+    try:
+        documents = _SEARCH_CLIENT.collections[_SEARCH_COLLECTION].documents
+
+        def _search_page(page):
+            params = {
+                'q': search,
+                'query_by': _SEARCH_QUERY_BY,
+                'sort_by': 'review_date:desc',
+                'per_page': limit,
+                'page': page,
+            }
+            if found_item_id:
+                params['filter_by'] = f'found_item_id:={found_item_id}'
+            result = documents.search(params)
+            return [hit['document']['review_id'] for hit in result.get('hits', [])], result
+
+        # Index pages are limit-aligned; an unaligned offset straddles two pages, so read both and slice
+        first_page, skip = divmod(offset, limit)
+        review_ids, result = _search_page(first_page + 1)
+        if skip and len(review_ids) == limit:
+            review_ids += _search_page(first_page + 2)[0]
+        review_ids = review_ids[skip:skip + limit]
+        return review_ids, int(result.get('found', len(review_ids)))
+    except Exception as e:
+        print(f"Error searching admin reviews index: {e}")
+        return None
+
+def _attach_display_fields(reviews):
+    """
+    Pair each review with its item name, category, item status and reviewer name.
+    Item name, category and reviewer are snapshots taken at creation time (legacy reviews
+    without snapshots are joined against found_items and users). Item status keeps changing
+    after the review, so it is always read live from found_items.
+
+    Returns:
+        list: (review_data, item_name, category, item_status, reviewer_name) tuples
+    """
+    # Batch-fetch the related items (live status, plus display fields for legacy reviews)
+    # and the reviewers of legacy reviews, projecting only displayed fields
+    legacy = [review_data for review_data in reviews if 'item_name_snapshot' not in review_data]
+    item_fields = ['found_item_name', 'category', 'status'] if legacy else ['status']
+    items_by_id = _fetch_fields_by_ids(
+        'found_items',
+        [review_data.get('found_item_id') for review_data in reviews],
+        item_fields
+    )
+    users_by_id = {}
+    if legacy:
+        users_by_id = _fetch_fields_by_ids(
+            'users',
+            [review_data.get('reviewed_by') for review_data in legacy],
+            ['name', 'email']
+        )
+    
+    rows = []
+    for review_data in reviews:
+        item_data = items_by_id.get(review_data.get('found_item_id'))
+        item_status = item_data.get('status', 'unknown') if item_data is not None else 'unknown'
+        if 'item_name_snapshot' in review_data:
+            item_name = review_data.get('item_name_snapshot') or 'Unknown Item'
+            category = review_data.get('category_snapshot') or 'Unknown'
+            reviewer_name = review_data.get('reviewer_name_snapshot') or 'Unknown Admin'
+            reviewer_email = review_data.get('reviewer_email_snapshot') or ''
         else:
-            new_id = "AR0001"
+            item_name = 'Unknown Item'
+            category = 'Unknown'
+            reviewer_name = 'Unknown'
+            
+            if item_data is not None:
+                item_name = item_data.get('found_item_name', 'Unknown Item')
+                category = item_data.get('category', 'Unknown')
+            
+            admin_data = users_by_id.get(review_data.get('reviewed_by'), {})
+            if admin_data:
+                reviewer_name = admin_data.get('name', 'Unknown Admin')
+            reviewer_email = admin_data.get('email', '')
         
+        if 'reviewed_by' in review_data and not review_data.get('reviewed_by_email'):
+            review_data['reviewed_by_email'] = reviewer_email
+        
+        rows.append((review_data, item_name, category, item_status, reviewer_name))
+    return rows
+
+# HiLo allocator for review IDs: each process reserves a block of IDs from a
+# shared counter document so the counter is only touched once per block.
+_ID_BLOCK_SIZE = 100
+_ID_COUNTER_DOC = ('counters', 'admin_reviews')
+_id_lo, _id_hi = 0, -1
+_id_lock = threading.Lock()
+
+def _latest_review_number():
+    """Return the numeric part of the highest existing review ID (0 if none)"""
+    reviews_ref = db.collection('admin_reviews')
+    query = reviews_ref.order_by('review_id', direction=firestore.Query.DESCENDING).limit(1)
+    for doc in query.stream():
+        latest_id = (doc.to_dict() or {}).get('review_id', 'AR0000')
+        if isinstance(latest_id, str) and latest_id.startswith('AR') and latest_id[2:].isdigit():
+            return int(latest_id[2:])
+        break
+    return 0
+
+def _reserve_review_id_block():
+    """Atomically reserve the next block of review numbers; returns the last number before the block"""
+    counter_ref = db.collection(_ID_COUNTER_DOC[0]).document(_ID_COUNTER_DOC[1])
+
+    @gc_firestore.transactional
+    def _reserve(transaction):
+        snapshot = counter_ref.get(transaction=transaction)
+        if snapshot.exists:
+            last = int((snapshot.to_dict() or {}).get('id_counter', 0))
+        else:
+            # Seed the counter from IDs allocated before the counter existed
+            last = _latest_review_number()
+        transaction.set(counter_ref, {'id_counter': last + _ID_BLOCK_SIZE}, merge=True)
+        return last
+
+    return _reserve(db.transaction())
+
+def generate_admin_review_id():
+    """Generate a unique admin review ID"""
+    global _id_lo, _id_hi
+    try:
+        with _id_lock:
+            if _id_lo > _id_hi:
+                last = _reserve_review_id_block()
+                _id_lo, _id_hi = last + 1, last + _ID_BLOCK_SIZE
+            new_id = f"AR{_id_lo:04d}"
+            _id_lo += 1
         return new_id
     except Exception as e:
         print(f"Error generating admin review ID: {str(e)}")
@@ -50,6 +372,25 @@ def create_admin_review(found_item_id, reviewed_by, review_status, notes):
         # Generate unique review ID
         review_id = generate_admin_review_id()
         
+        # Update the found item status based on review outcome
+        item_ref = db.collection('found_items').document(found_item_id)
+        
+        # Map review status to item status
+        status_mapping = {
+            'donated': 'donated',
+            'discarded': 'discarded',
+            'returned': 'returned'
+        }
+        
+        new_status = status_mapping.get(review_status, 'overdue')
+        
+        # Snapshot the display fields that never change after the review, so listings only
+        # join found_items for the live item status. Reviews are historical records, so
+        # later edits to the item name or category are not propagated.
+        item_doc = item_ref.get(field_paths=['found_item_name', 'category'])
+        item_data = (item_doc.to_dict() or {}) if item_doc.exists else {}
+        reviewer_data = _get_reviewer_fields(reviewed_by)
+        
         # Create the admin review document
         review_data = {
             'review_id': review_id,
@@ -58,24 +399,16 @@ def create_admin_review(found_item_id, reviewed_by, review_status, notes):
             'review_status': review_status,
             'review_date': firestore.SERVER_TIMESTAMP,
             'notes': notes,
+            'item_name_snapshot': item_data.get('found_item_name', 'Unknown Item'),
+            'category_snapshot': item_data.get('category', 'Unknown'),
+            'reviewer_name_snapshot': reviewer_data.get('name', 'Unknown Admin'),
+            'reviewer_email_snapshot': reviewer_data.get('email', ''),
             'created_at': firestore.SERVER_TIMESTAMP,
             'updated_at': firestore.SERVER_TIMESTAMP
         }
         
         # Add the review to Firestore
-        db.collection('admin_reviews').document(review_id).set(review_data)
-        
-        # Update the found item status based on review outcome
-        item_ref = db.collection('found_items').document(found_item_id)
-        
-        # Map review status to item status
-        status_mapping = {
-            'donated': 'donated',
-            'discarded': 'discarded',
-            'returned': 'returned'
-        }
-        
-        new_status = status_mapping.get(review_status, 'overdue')
+        write_result = db.collection('admin_reviews').document(review_id).set(review_data)
         
         # Update the found item
         update_data = {
@@ -96,6 +429,10 @@ def create_admin_review(found_item_id, reviewed_by, review_status, notes):
         
         item_ref.update(update_data)
         
+        # Keep the search index in sync with the new review. Server timestamps resolve to the
+        # commit time, so the write's update_time is the stored review_date.
+        _index_review_for_search({**review_data, 'review_date': write_result.update_time})
+        
         return {
             'success': True,
             'message': f'Admin review created successfully. Item status updated to {new_status}.',
@@ -108,7 +445,115 @@ def create_admin_review(found_item_id, reviewed_by, review_status, notes):
             'error': f'Failed to create admin review: {str(e)}'
         }
 
-def get_admin_reviews(limit=20, offset=0, found_item_id=None, search=None, status_filter=None, sort_by=None, sort_order='asc'):
+_TIMESTAMP_FIELDS = ('review_date', 'created_at', 'updated_at')
+
+def _serialize_timestamps(review_data, fields=_TIMESTAMP_FIELDS):
+    """Replace Firestore timestamps on a review with second-precision ISO 8601 strings, in place."""
+    for field in fields:
+        value = review_data.get(field)
+        if isinstance(value, datetime.datetime):
+            review_data[field] = value.isoformat(timespec='seconds')
+    return review_data
+
+# Sort key extractors for get_admin_reviews, keyed by the sort_by parameter.
+# Each takes a (review_data, item_name, category, item_status, reviewer_name) row.
+_SORT_KEYS = {
+    'review_id': lambda row: row[0].get('review_id', ''),
+    'found_item_id': lambda row: row[0].get('found_item_id', ''),
+    'item_name': lambda row: row[1].lower(),
+    'status': lambda row: row[3].lower(),
+    'reviewed_by_name': lambda row: row[4].lower(),
+    'review_date': lambda row: row[0].get('review_date', datetime.datetime.min),
+    'notes': lambda row: row[0].get('notes', '').lower(),
+}
+
+def _iter_review_rows(query, batch_size=_IN_QUERY_CHUNK):
+    """Stream a review query, joining display fields one batch at a time so callers can stop early"""
+    batch = []
+    for doc in query.stream():
+        batch.append(doc.to_dict() or {})
+        if len(batch) >= batch_size:
+            yield from _attach_display_fields(batch)
+            batch = []
+    if batch:
+        yield from _attach_display_fields(batch)
+
+def _format_review_row(row):
+    """Format one (review_data, item_name, category, item_status, reviewer_name) row for the API"""
+    review_data, item_name, category, item_status, reviewer_name = row
+    # Set the item details we already fetched
+    review_data['item_name'] = item_name
+    review_data['category'] = category
+    review_data['status'] = item_status  # Use found item status instead of review status
+    review_data['reviewed_by_name'] = reviewer_name  # Use the reviewer name we already fetched
+
+    # Convert Firestore timestamps to ISO 8601 strings
+    _serialize_timestamps(review_data)
+    return review_data
+
+def _build_reviews_result(paginated_docs, total_count, has_more=False):
+    """Format a page of rows for the API"""
+    return {
+        'success': True,
+        'reviews': [_format_review_row(row) for row in paginated_docs],
+        'count': total_count,
+        'has_more': has_more
+    }
+
+def _build_reviews_query(found_item_id=None, status_filter=None):
+    """Build the base admin_reviews query, newest first"""
+    query = db.collection('admin_reviews')
+    if found_item_id:
+        query = query.where('found_item_id', '==', found_item_id)
+    if status_filter:
+        query = query.where('review_status', '==', status_filter)
+    return query.order_by('review_date', direction=firestore.Query.DESCENDING)
+
+def _filter_review_rows(rows, search=None, status_filter=None):
+    """Yield the rows matching the free-text search and found item status filter"""
+    # Apply search filter on client side (since Firestore doesn't support full-text search)
+    search_terms = search.lower().split() if search else []
+    for row in rows:
+        review_data, item_name, category, item_status, reviewer_name = row
+        # Apply search filter: every search term must appear in one of the searchable fields
+        if search_terms:
+            corpus = (f"{item_name}\0{category}\0{reviewer_name}\0"
+                      f"{review_data.get('notes', '')}\0{review_data.get('review_status', '')}\0"
+                      f"{review_data.get('review_id', '')}").lower()
+            if not all(term in corpus for term in search_terms):
+                continue
+        
+        # Apply status filter (filter by found item status, not review status)
+        if status_filter and status_filter != 'all':
+            if item_status != status_filter:
+                continue
+        
+        yield row
+
+def iter_admin_reviews(limit=None, offset=0, found_item_id=None, search=None, status_filter=None):
+    """
+    Lazily yield formatted admin reviews, newest first
+    
+    Reviews are read from Firestore and formatted one batch at a time, so memory
+    stays flat regardless of how many reviews are requested.
+    
+    Args:
+        limit (int, optional): Maximum number of reviews to yield (None for all)
+        offset (int): Number of matching reviews to skip
+        found_item_id (str, optional): Filter by specific found item ID
+        search (str, optional): Search term for item name, category, or notes
+        status_filter (str, optional): Filter by review status
+    
+    Yields:
+        dict: Review data in the same shape as get_admin_reviews
+    """
+    query = _build_reviews_query(found_item_id, status_filter)
+    rows = _filter_review_rows(_iter_review_rows(query), search, status_filter)
+    stop = None if limit is None else offset + limit
+    for row in itertools.islice(rows, offset, stop):
+        yield _format_review_row(row)
+
+def get_admin_reviews(limit=20, offset=0, found_item_id=None, search=None, status_filter=None, sort_by=None, sort_order='asc', exact_count=True):
     """
     Get admin reviews with pagination and optional filtering
     
@@ -120,159 +565,59 @@ def get_admin_reviews(limit=20, offset=0, found_item_id=None, search=None, statu
         status_filter (str, optional): Filter by review status
         sort_by (str, optional): Field to sort by
         sort_order (str, optional): Sort order ('asc' or 'desc')
+        exact_count (bool, optional): When False and no sort is requested, stop scanning once
+            the requested page is filled; count is then a lower bound and has_more tells
+            whether further pages exist
     
     Returns:
-        dict: Result with success status, reviews list, and count
+        dict: Result with success status, reviews list, count, and has_more
     """
     try:
-        reviews_ref = db.collection('admin_reviews')
-        
-        # Apply filters
-        query = reviews_ref
-        if found_item_id:
-            query = query.where('found_item_id', '==', found_item_id)
-        
-        if status_filter:
-            query = query.where('review_status', '==', status_filter)
-        
-        # Order by review date (newest first)
-        query = query.order_by('review_date', direction=firestore.Query.DESCENDING)
-        
-        # Get all documents for filtering and counting
-        all_docs = list(query.stream())
-        
-        # Apply search filter on client side (since Firestore doesn't support full-text search)
-        filtered_docs = []
-        for doc in all_docs:
-            review_data = doc.to_dict()
-            
-            # Get found item details and reviewer name for search
-            item_name = 'Unknown Item'
-            category = 'Unknown'
-            item_status = 'unknown'
-            reviewer_name = 'Unknown'
-            
-            if 'found_item_id' in review_data:
-                try:
-                    item_ref = db.collection('found_items').document(review_data['found_item_id'])
-                    item_doc = item_ref.get()
-                    if item_doc.exists:
-                        item_data = item_doc.to_dict()
-                        item_name = item_data.get('found_item_name', 'Unknown Item')
-                        category = item_data.get('category', 'Unknown')
-                        item_status = item_data.get('status', 'unknown')
-                except Exception as e:
-                    print(f"Error fetching item data: {e}")
-            
-            # Get reviewer name for search
-            if 'reviewed_by' in review_data:
-                try:
-                    admin_ref = db.collection('users').document(review_data['reviewed_by'])
-                    admin_doc = admin_ref.get()
-                    if admin_doc.exists:
-                        admin_data = admin_doc.to_dict()
-                        reviewer_name = admin_data.get('name', 'Unknown Admin')
-                except Exception as e:
-                    print(f"Error fetching admin data: {e}")
-            
-            # Apply search filter
-            if search:
-                search_lower = search.lower()
-                searchable_text = ' '.join([
-                    item_name.lower(),
-                    category.lower(),
-                    reviewer_name.lower(),
-                    review_data.get('notes', '').lower(),
-                    review_data.get('review_status', '').lower(),
-                    review_data.get('review_id', '').lower()
-                ])
-                if search_lower not in searchable_text:
-                    continue
-            
-            # Apply status filter (filter by found item status, not review status)
-            if status_filter and status_filter != 'all':
-                if item_status != status_filter:
-                    continue
-            
-            filtered_docs.append((doc, item_name, category, item_status, reviewer_name))
+        # Delegate free-text search to the search index when one is configured.
+        # Filters and sorts on live item fields still require the Firestore path below.
+        indexed = None
+        if search and not status_filter and not sort_by:
+            indexed = _search_indexed_reviews(search, limit, offset, found_item_id)
+        if indexed is not None:
+            review_ids, total_count = indexed
+            reviews_by_id = _fetch_fields_by_ids('admin_reviews', review_ids)
+            paginated_docs = _attach_display_fields(
+                [reviews_by_id[review_id] for review_id in review_ids if review_id in reviews_by_id]
+            )
+            return _build_reviews_result(paginated_docs, total_count, offset + len(review_ids) < total_count)
+        
+        query = _build_reviews_query(found_item_id, status_filter)
+        
+        # Without a sort the query order is final, so the scan can stop one row past the
+        # requested page (the extra row tells us whether another page exists)
+        stop_after = None if (exact_count or sort_by) else offset + limit + 1
+        
+        filtered_docs = list(itertools.islice(
+            _filter_review_rows(_iter_review_rows(query), search, status_filter), stop_after
+        ))
         
         total_count = len(filtered_docs)
         
         # Apply sorting if specified
         if sort_by and filtered_docs:
-            def get_sort_key(item):
-                doc, item_name, category, item_status, reviewer_name = item
-                review_data = doc.to_dict()
-                
-                if sort_by == 'review_id':
-                    return review_data.get('review_id', '')
-                elif sort_by == 'found_item_id':
-                    return review_data.get('found_item_id', '')
-                elif sort_by == 'item_name':
-                    return item_name.lower()
-                elif sort_by == 'status':
-                    return item_status.lower()
-                elif sort_by == 'reviewed_by_name':
-                    return reviewer_name.lower()
-                elif sort_by == 'review_date':
-                    return review_data.get('review_date', datetime.datetime.min)
-                elif sort_by == 'notes':
-                    return review_data.get('notes', '').lower()
-                else:
-                    return ''
-            
-            reverse_order = sort_order.lower() == 'desc'
-            filtered_docs.sort(key=get_sort_key, reverse=reverse_order)
+            key_fn = _SORT_KEYS.get(sort_by)
+            if key_fn:
+                reverse_order = sort_order.lower() == 'desc'
+                filtered_docs.sort(key=key_fn, reverse=reverse_order)
         
         # Apply pagination
         paginated_docs = filtered_docs[offset:offset + limit]
+        has_more = len(filtered_docs) > offset + limit
         
-        reviews = []
-        for doc, item_name, category, item_status, reviewer_name in paginated_docs:
-            review_data = doc.to_dict()
-            
-            # Set the item details we already fetched
-            review_data['item_name'] = item_name
-            review_data['category'] = category
-            review_data['status'] = item_status  # Use found item status instead of review status
-            review_data['reviewed_by_name'] = reviewer_name  # Use the reviewer name we already fetched
-            
-            # Get additional admin details (email) if needed
-            if 'reviewed_by' in review_data and not review_data.get('reviewed_by_email'):
-                try:
-                    admin_ref = db.collection('users').document(review_data['reviewed_by'])
-                    admin_doc = admin_ref.get()
-                    if admin_doc.exists:
-                        admin_data = admin_doc.to_dict()
-                        review_data['reviewed_by_email'] = admin_data.get('email', '')
-                    else:
-                        review_data['reviewed_by_email'] = ''
-                except Exception as e:
-                    print(f"Error fetching admin email: {e}")
-                    review_data['reviewed_by_email'] = ''
-            
-            # Convert Firestore timestamps to readable format
-            if 'review_date' in review_data and review_data['review_date']:
-                review_data['review_date'] = review_data['review_date'].strftime('%Y-%m-%d %H:%M:%S')
-            if 'created_at' in review_data and review_data['created_at']:
-                review_data['created_at'] = review_data['created_at'].strftime('%Y-%m-%d %H:%M:%S')
-            if 'updated_at' in review_data and review_data['updated_at']:
-                review_data['updated_at'] = review_data['updated_at'].strftime('%Y-%m-%d %H:%M:%S')
-            
-            reviews.append(review_data)
-        
-        return {
-            'success': True,
-            'reviews': reviews,
-            'count': total_count
-        }
+        return _build_reviews_result(paginated_docs, total_count, has_more)
         
     except Exception as e:
         return {
             'success': False,
             'error': f'Failed to get admin reviews: {str(e)}',
             'reviews': [],
-            'count': 0
+            'count': 0,
+            'has_more': False
         }
 
 def get_admin_review_by_id(review_id):
@@ -297,13 +642,8 @@ def get_admin_review_by_id(review_id):
         
         review_data = doc.to_dict()
         
-        # Convert Firestore timestamps to readable format
-        if 'review_date' in review_data and review_data['review_date']:
-            review_data['review_date'] = review_data['review_date'].strftime('%Y-%m-%d %H:%M:%S')
-        if 'created_at' in review_data and review_data['created_at']:
-            review_data['created_at'] = review_data['created_at'].strftime('%Y-%m-%d %H:%M:%S')
-        if 'updated_at' in review_data and review_data['updated_at']:
-            review_data['updated_at'] = review_data['updated_at'].strftime('%Y-%m-%d %H:%M:%S')
+        # Convert Firestore timestamps to ISO 8601 strings
+        _serialize_timestamps(review_data)
         
         return {
             'success': True,
@@ -316,45 +656,55 @@ def get_admin_review_by_id(review_id):
             'error': f'Failed to get admin review: {str(e)}'
         }
 
-def get_reviews_by_admin(admin_id, limit=20, offset=0):
+def get_reviews_by_admin(admin_id, limit=20, offset=0, start_after_review_date=None):
     """
     Get admin reviews by a specific admin
     
     Args:
         admin_id (str): ID of the admin
         limit (int): Number of reviews to return
-        offset (int): Number of reviews to skip
+        offset (int): Number of reviews to skip (legacy; prefer start_after_review_date)
+        start_after_review_date (str, optional): ISO timestamp cursor from a previous
+            response's next_cursor; reads cost O(limit) regardless of page number
     
     Returns:
-        dict: Result with success status, reviews list, and count
+        dict: Result with success status, reviews list, count, and next_cursor
     """
     try:
         reviews_ref = db.collection('admin_reviews')
         query = reviews_ref.where('reviewed_by', '==', admin_id)
         query = query.order_by('review_date', direction=firestore.Query.DESCENDING)
         
-        # Get total count
-        all_docs = query.stream()
-        total_count = len(list(all_docs))
+        # Get total count with a server-side aggregation instead of streaming every review
+        total_count = query.count().get()[0][0].value
         
-        # Apply pagination
-        query = query.offset(offset).limit(limit)
-        docs = query.stream()
+        # Apply pagination: cursor when provided, since offset still reads every skipped document
+        if start_after_review_date:
+            cursor = datetime.datetime.fromisoformat(start_after_review_date)
+            query = query.start_after({'review_date': cursor})
+        elif offset:
+            query = query.offset(offset)
+        docs = query.limit(limit).stream()
         
         reviews = []
+        next_cursor = None
         for doc in docs:
             review_data = doc.to_dict()
             
-            # Convert Firestore timestamps to readable format
-            if 'review_date' in review_data and review_data['review_date']:
-                review_data['review_date'] = review_data['review_date'].strftime('%Y-%m-%d %H:%M:%S')
+            # Keep the full-precision timestamp for the cursor before formatting for display
+            if review_data.get('review_date'):
+                next_cursor = review_data['review_date'].isoformat()
+            
+            # Convert Firestore timestamps to ISO 8601 strings
+            _serialize_timestamps(review_data)
             
             reviews.append(review_data)
         
         return {
             'success': True,
             'reviews': reviews,
-            'count': total_count
+            'count': total_count,
+            'next_cursor': next_cursor if len(reviews) == limit else None
         }
         
     except Exception as e:
@@ -362,5 +712,6 @@ def get_reviews_by_admin(admin_id, limit=20, offset=0):
             'success': False,
             'error': f'Failed to get admin reviews: {str(e)}',
             'reviews': [],
-            'count': 0
+            'count': 0,
+            'next_cursor': None
         }
\ No newline at end of file
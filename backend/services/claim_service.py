@@ -4,29 +4,52 @@ Claim service for handling item claim lifecycle:
 - Capture and store face image
 - Select verification method
 - Generate a time-limited QR code
+
+Face detection models (Haar cascade, optional Numba kernel) are loaded once at import.
+Under a forking server such as gunicorn, `--preload` lets workers share that parsed
+state copy-on-write instead of each worker loading it again.
 """
 import os
 import io
+import re
+import json
 import uuid
 import secrets
 import base64
+import math
+import queue
+import threading
+import time
+import functools
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 import logging
 from PIL import Image, ImageDraw, ImageFont
 from firebase_admin import firestore
 from google.cloud import firestore as gc_firestore
+from google.api_core import retry as api_retry
+from google.api_core.exceptions import Aborted, DeadlineExceeded, ServiceUnavailable
 from ..database import db
-from .storage_service import upload_image_to_storage
+from .storage_service import upload_bytes_to_storage, delete_image_from_storage
 from .crypto_service import (
     encrypt_bytes_with_envelope,
     decrypt_envelope_to_bytes,
+    get_active_fernet,
     CryptoConfigError,
     InvalidToken,
 )
 from .claim_validation_service import ClaimValidationService
-from .SMTP_server import send_email
+from .SMTP_server import send_email, get_smtp_config
 import numpy as np
 
+# Shared collection references, built once instead of on every call
+_CLAIMS = db.collection('claims')
+_FOUND_ITEMS = db.collection('found_items')
+_LOCKERS = db.collection('lockers')
+_USERS = db.collection('users')
+_NOTIFICATIONS = db.collection('notifications')
+
 # Optional OpenCV integration for robust face detection and feature extraction
 _OPENCV_AVAILABLE = False
 _OPENCV_VERSION = None
@@ -34,38 +57,229 @@ _FACE_CASCADE = None
 try:
     import cv2  # Ensure opencv-python is installed
     _OPENCV_VERSION = getattr(cv2, '__version__', 'unknown')
-    cascade_path = os.path.join(cv2.data.haarcascades, 'haarcascade_frontalface_default.xml')
+    _HAARCASCADES_DIR = cv2.data.haarcascades
+    cascade_path = os.path.join(_HAARCASCADES_DIR, 'haarcascade_frontalface_default.xml')
+    # Load once per process; a repeated import reuses the module-level classifier
     _FACE_CASCADE = cv2.CascadeClassifier(cascade_path)
     # Validate cascade loaded
     if _FACE_CASCADE is not None and not _FACE_CASCADE.empty():
         _OPENCV_AVAILABLE = True
+    # Let detectMultiScale spread its work over a few cores
+    cv2.setNumThreads(max(1, min(4, (os.cpu_count() or 2))))
 except Exception:
     # OpenCV not available; will fall back to PIL-only placeholder embedding
     _OPENCV_AVAILABLE = False
     _FACE_CASCADE = None
 
-# Simple in-process cache for frequently accessed claim documents
-# Cache format: { claim_id: { 'doc': dict, 'ts': datetime.utcnow() } }
-_CLAIM_CACHE = {}
+# Optional qrcode integration; without it QR generation falls back to a placeholder image
+try:
+    import qrcode
+    _QRCODE_AVAILABLE = True
+except ImportError:
+    qrcode = None
+    _QRCODE_AVAILABLE = False
+
+# Optional orjson for QR payload parsing; falls back to the stdlib json module.
+# Both accept str or bytes, and orjson.JSONDecodeError subclasses ValueError.
+try:
+    import orjson
+    _json_loads = orjson.loads
+    _ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    _json_loads = json.loads
+    _ORJSON_AVAILABLE = False
+
+def _lbp_histogram_np(gray_small: np.ndarray) -> np.ndarray:
+    """256-bin histogram of basic 8-neighbor LBP codes over the interior pixels."""
+    # Compare every neighbor against the center pixels with whole-array ops,
+    # clockwise from the top-left neighbor (bit 7) to the left neighbor (bit 0)
+    c = gray_small[1:-1, 1:-1]
+    code = (gray_small[:-2, :-2] >= c).astype(np.uint8) << 7
+    code |= (gray_small[:-2, 1:-1] >= c).astype(np.uint8) << 6
+    code |= (gray_small[:-2, 2:] >= c).astype(np.uint8) << 5
+    code |= (gray_small[1:-1, 2:] >= c).astype(np.uint8) << 4
+    code |= (gray_small[2:, 2:] >= c).astype(np.uint8) << 3
+    code |= (gray_small[2:, 1:-1] >= c).astype(np.uint8) << 2
+    code |= (gray_small[2:, :-2] >= c).astype(np.uint8) << 1
+    code |= (gray_small[1:-1, :-2] >= c).astype(np.uint8)
+    return np.bincount(code.ravel(), minlength=256).astype(np.float32)
+
+_lbp_histogram = _lbp_histogram_np
+
+# Optional Numba kernel: computes the codes and histogram in a single pass without
+# temporary arrays. Falls back to the NumPy implementation when Numba is unavailable.
+_NUMBA_AVAILABLE = False
+try:
+    import numba
+
+    @numba.njit(cache=True, parallel=True, fastmath=True)
+    def _lbp_histogram_nb(gray_small):
+        h, w = gray_small.shape
+        # One histogram row per image row so parallel iterations never share a bin
+        rows = np.zeros((h, 256), np.int64)
+        for i in numba.prange(1, h - 1):
+            for j in range(1, w - 1):
+                c = gray_small[i, j]
+                code = 0
+                if gray_small[i - 1, j - 1] >= c:
+                    code |= 128
+                if gray_small[i - 1, j] >= c:
+                    code |= 64
+                if gray_small[i - 1, j + 1] >= c:
+                    code |= 32
+                if gray_small[i, j + 1] >= c:
+                    code |= 16
+                if gray_small[i + 1, j + 1] >= c:
+                    code |= 8
+                if gray_small[i + 1, j] >= c:
+                    code |= 4
+                if gray_small[i + 1, j - 1] >= c:
+                    code |= 2
+                if gray_small[i, j - 1] >= c:
+                    code |= 1
+                rows[i, code] += 1
+        return rows.sum(axis=0).astype(np.float32)
+
+    # Warm the JIT at import so the first capture does not pay the compile cost
+    _lbp_histogram_nb(np.zeros((64, 64), np.uint8))
+    _lbp_histogram = _lbp_histogram_nb
+    _NUMBA_AVAILABLE = True
+except Exception:
+    _NUMBA_AVAILABLE = False
+
+def _pil_downsample_embedding(img_bytes: bytes) -> list:
+    """Deterministic 256-dim embedding from a 16x16 grayscale thumbnail (no OpenCV required)."""
+    img = Image.open(io.BytesIO(img_bytes)).convert('L').resize((16, 16))
+    arr = np.asarray(img, dtype=np.uint8)
+    return np.round(arr.ravel() / 255.0, 6).tolist()
+
+# Optional DeepFace (heavy dependency), imported once at load rather than on every capture.
+# The Facenet512 weights are only built on the first capture (see _ensure_deepface_model), so
+# importing this module from scripts or other services never loads or downloads them.
+_DEEPFACE = None
+_DEEPFACE_AVAILABLE = False
+_DEEPFACE_MODEL_READY = False
+_DEEPFACE_MODEL_LOCK = threading.Lock()
+try:
+    from deepface import DeepFace as _DEEPFACE
+    _DEEPFACE_AVAILABLE = True
+except Exception:
+    _DEEPFACE = None
+    _DEEPFACE_AVAILABLE = False
+
+def _ensure_deepface_model():
+    """Build the Facenet512 model once per process; concurrent first captures wait for one build."""
+    global _DEEPFACE_MODEL_READY
+    if _DEEPFACE_MODEL_READY:
+        return
+    with _DEEPFACE_MODEL_LOCK:
+        if not _DEEPFACE_MODEL_READY:
+            _DEEPFACE.build_model('Facenet512')
+            _DEEPFACE_MODEL_READY = True
+
+# Captures larger than this (longest side, px) are downscaled before face detection
+_DETECT_MAX_DIM = 480.0
+# Minimum detected-face area (margin-padded box over frame) accepted for a capture
+_MIN_DET_AREA_RATIO_VALUABLE = 0.07
+_MIN_DET_AREA_RATIO = 0.02
+
+# Optional YuNet CNN face detector (cv2.FaceDetectorYN, OpenCV >= 4.5.4). Enabled by pointing
+# FACE_DETECTOR_MODEL_PATH at face_detection_yunet_*.onnx; otherwise the Haar cascade is used.
+_YUNET_MODEL_PATH = os.environ.get('FACE_DETECTOR_MODEL_PATH')
+_YUNET_INPUT_DIM = 320.0
+_YUNET = None
+_YUNET_LOCK = threading.Lock()
+
+def _get_yunet():
+    """Lazily construct the YuNet detector; returns None when it is not configured or fails to load."""
+    global _YUNET
+    if _YUNET is None:
+        with _YUNET_LOCK:
+            if _YUNET is None:
+                _YUNET = False
+                if _YUNET_MODEL_PATH and _OPENCV_AVAILABLE and hasattr(cv2, 'FaceDetectorYN'):
+                    try:
+                        _YUNET = cv2.FaceDetectorYN.create(
+                            _YUNET_MODEL_PATH, "", (320, 320),
+                            score_threshold=0.6, nms_threshold=0.3, top_k=5
+                        )
+                    except Exception as e:
+                        _logger.warning('YuNet face detector unavailable, using Haar cascade: %s', str(e))
+    return _YUNET or None
+
+def _detect_faces(gray: np.ndarray, bgr: np.ndarray | None = None, min_size: int = 60) -> list:
+    """Detect faces and return (x, y, w, h) boxes in the coordinates of `gray`.
+    `min_size` is the smallest Haar face side in `gray` pixels."""
+    detector = _get_yunet()
+    if detector is not None:
+        src = bgr if bgr is not None else gray
+        scale = min(1.0, _YUNET_INPUT_DIM / float(max(src.shape[:2])))
+        small = cv2.resize(src, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA) if scale < 1.0 else src
+        if small.ndim == 2:
+            small = cv2.cvtColor(small, cv2.COLOR_GRAY2BGR)
+        with _YUNET_LOCK:
+            detector.setInputSize((small.shape[1], small.shape[0]))
+            _, found = detector.detect(small)
+        if found is None:
+            return []
+        return [tuple(int(round(v / scale)) for v in row[:4]) for row in found]
+
+    # Haar cascade: detect on a copy capped at _DETECT_MAX_DIM px, then map the boxes back
+    scale = _DETECT_MAX_DIM / float(max(gray.shape))
+    if scale < 1.0:
+        small = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        min_side = max(20, int(min_size * scale))
+        found = _FACE_CASCADE.detectMultiScale(small, scaleFactor=1.2, minNeighbors=5, minSize=(min_side, min_side))
+        return [tuple(int(round(v / scale)) for v in rect) for rect in found]
+    found = _FACE_CASCADE.detectMultiScale(gray, scaleFactor=1.2, minNeighbors=5, minSize=(min_size, min_size))
+    return [tuple(int(v) for v in rect) for rect in found]
+
+# Per-thread 64x64 scratch buffer for the LBP resize, reused across captures
+_SCRATCH = threading.local()
+
+def _scratch_64() -> np.ndarray:
+    buf = getattr(_SCRATCH, 'gray_64', None)
+    if buf is None:
+        buf = _SCRATCH.gray_64 = np.empty((64, 64), np.uint8)
+    return buf
+
+# Simple in-process cache for frequently accessed claim documents.
+# Bounded LRU with TTL, guarded by a lock for threaded WSGI workers.
+# Cache format: OrderedDict{ claim_id: { 'doc': dict, 'ts': time.monotonic() } }, oldest first
+_CLAIM_CACHE = OrderedDict()
 _CLAIM_CACHE_TTL_SECONDS = 30
+_CLAIM_CACHE_MAXSIZE = 1024
+_CLAIM_CACHE_LOCK = threading.RLock()
 _logger = logging.getLogger(__name__)
 _logger.setLevel(logging.INFO)
 
-def _get_claim_data_cached(claim_id: str):
+def _get_claim_data_cached(claim_id: str, fields: list | None = None):
     """Fetch claim data with a short-lived cache to reduce Firestore reads.
+    When `fields` is given, a cache miss reads only those fields (server-side projection)
+    and the partial document is not cached.
     Returns: (ok: bool, data_or_error: dict, status_code: int)
     """
     try:
-        now = datetime.utcnow()
-        cached = _CLAIM_CACHE.get(claim_id)
-        if cached and (now - cached['ts']).total_seconds() < _CLAIM_CACHE_TTL_SECONDS:
-            return True, cached['doc'], 200
-        ref = db.collection('claims').document(claim_id)
-        snap = ref.get()
+        now = time.monotonic()
+        with _CLAIM_CACHE_LOCK:
+            cached = _CLAIM_CACHE.get(claim_id)
+            if cached:
+                if now - cached['ts'] < _CLAIM_CACHE_TTL_SECONDS:
+                    _CLAIM_CACHE.move_to_end(claim_id)
+                    return True, cached['doc'], 200
+                del _CLAIM_CACHE[claim_id]
+        ref = _CLAIMS.document(claim_id)
+        snap = ref.get(field_paths=fields) if fields else ref.get()
         if not snap.exists:
             return False, {'error': 'Claim not found'}, 404
-        data = snap.to_dict()
-        _CLAIM_CACHE[claim_id] = {'doc': data, 'ts': now}
+        data = snap.to_dict() or {}
+        if not fields:
+            with _CLAIM_CACHE_LOCK:
+                _CLAIM_CACHE[claim_id] = {'doc': data, 'ts': now}
+                _CLAIM_CACHE.move_to_end(claim_id)
+                while len(_CLAIM_CACHE) > _CLAIM_CACHE_MAXSIZE:
+                    _CLAIM_CACHE.popitem(last=False)
         return True, data, 200
     except Exception as e:
         return False, {'error': str(e)}, 500
@@ -73,23 +287,61 @@ def _get_claim_data_cached(claim_id: str):
 def clear_claim_cache(claim_id: str | None = None):
     """Clear claim cache for a specific claim_id or all if None."""
     try:
-        if claim_id:
-            _CLAIM_CACHE.pop(claim_id, None)
-        else:
-            _CLAIM_CACHE.clear()
+        # Most writes hit claims that were never cached; skip the lock for those
+        if claim_id and claim_id not in _CLAIM_CACHE:
+            return
+        with _CLAIM_CACHE_LOCK:
+            if claim_id:
+                _CLAIM_CACHE.pop(claim_id, None)
+            else:
+                _CLAIM_CACHE.clear()
     except Exception:
         pass
 
+# Short-lived cache for get_qr_status_for_item, which clients poll for countdown UI
+_QR_STATUS_CACHE = OrderedDict()
+_QR_STATUS_TTL_SECONDS = 5
+_QR_STATUS_CACHE_MAXSIZE = 4096
+_QR_STATUS_CACHE_LOCK = threading.RLock()
+
+def _invalidate_qr_status(found_item_id: str | None = None):
+    """Drop the cached QR status for a found item (or all items if None) after QR state changes."""
+    try:
+        with _QR_STATUS_CACHE_LOCK:
+            if found_item_id:
+                _QR_STATUS_CACHE.pop(found_item_id, None)
+            else:
+                _QR_STATUS_CACHE.clear()
+    except Exception:
+        pass
+
+def _latest_claim_number() -> int:
+    """Numeric part of the highest numeric claim_id (0 if none); used to seed the counter."""
+    # Random fallback IDs such as 'Cab12' sort above 'C0xxx'; skip them
+    query = _CLAIMS.order_by('claim_id', direction=firestore.Query.DESCENDING).select(['claim_id'])
+    for doc in query.stream():
+        last_id = (doc.to_dict() or {}).get('claim_id')
+        if isinstance(last_id, str) and last_id.startswith('C') and last_id[1:].isdigit():
+            return int(last_id[1:])
+    return 0
+
 def _generate_next_claim_id():
-    """Generate next claim_id like C0001."""
+    """Generate next claim_id like C0001 from the transactional counters/claims document."""
     try:
-        query = db.collection('claims').order_by('claim_id', direction=firestore.Query.DESCENDING).limit(1)
-        docs = list(query.stream())
-        last_id = docs[0].to_dict().get('claim_id') if docs else None
-        if not last_id:
-            return 'C0001'
-        num = int(str(last_id)[1:])
-        return f"C{num+1:04d}"
+        counter_ref = db.collection('counters').document('claims')
+
+        @gc_firestore.transactional
+        def _txn(transaction):
+            snap = counter_ref.get(transaction=transaction)
+            if snap.exists:
+                n = int((snap.to_dict() or {}).get('next') or 1)
+            else:
+                # First use: continue from IDs minted before the counter existed
+                n = _latest_claim_number() + 1
+            transaction.set(counter_ref, {'next': n + 1}, merge=True)
+            return f"C{n:04d}"
+
+        return _txn(db.transaction())
     except Exception:
         # Fallback
         return f"C{uuid.uuid4().hex[:4]}"
@@ -139,7 +391,7 @@ def start_claim(user_id: str, found_item_id: str, student_remarks: str | None =
             # If claim exists and is in a valid state (pending, approved, pending_approval), reuse it
             valid_statuses = ['pending', 'approved', 'pending_approval']
             if existing_status in valid_statuses:
-                _logger.info(f"Reusing existing claim {existing_claim_id} for user {user_id} and item {found_item_id} (status: {existing_status})")
+                _logger.info("Reusing existing claim %s for user %s and item %s (status: %s)", existing_claim_id, user_id, found_item_id, existing_status)
                 
                 # Release the per-user session lock since we're not creating a new claim
                 try:
@@ -174,8 +426,8 @@ def start_claim(user_id: str, found_item_id: str, student_remarks: str | None =
         # Double-check item availability outside of transaction (simpler, reduces contention).
         # The session lock from validation already prevents concurrent attempts by the same user.
         try:
-            item_ref = db.collection('found_items').document(found_item_id)
-            item_doc = item_ref.get()
+            item_ref = _FOUND_ITEMS.document(found_item_id)
+            item_doc = item_ref.get(field_paths=['status'])
             if not item_doc.exists:
                 ClaimValidationService.release_user_session_lock(user_id)
                 return False, {'error': 'Item no longer exists', 'code': 'ITEM_NOT_FOUND'}, 404
@@ -190,6 +442,7 @@ def start_claim(user_id: str, found_item_id: str, student_remarks: str | None =
             
             # Determine initial status based on item type
             # Non-valuable items are automatically approved, valuable items require admin approval
+            item_name, item_image_url, _ = _item_display_fields(item_data)
             initial_status = 'approved' if not is_valuable else 'pending'
             approved_by = 'system_auto_approval' if not is_valuable else None
             approved_at = datetime.now(timezone.utc) if not is_valuable else None
@@ -210,11 +463,15 @@ def start_claim(user_id: str, found_item_id: str, student_remarks: str | None =
                 'approved_by': approved_by,
                 'approved_at': approved_at,
                 'verified_at': None,
-                'created_at': datetime.now(timezone.utc)
+                'created_at': datetime.now(timezone.utc),
+                # Denormalized from the item so face capture and claim listings can skip item reads
+                'is_valuable': bool(is_valuable),
+                'item_name': item_name,
+                'item_image_url': item_image_url
             }
 
             # Create the claim document
-            claim_ref = db.collection('claims').document(claim_id)
+            claim_ref = _CLAIMS.document(claim_id)
             claim_ref.set(claim_doc)
 
             # Clear claim cache for this new claim
@@ -234,13 +491,13 @@ def start_claim(user_id: str, found_item_id: str, student_remarks: str | None =
                 }
             }
 
-            _logger.info(f"Claim created successfully: {claim_id} for user {user_id} and item {found_item_id}")
+            _logger.info("Claim created successfully: %s for user %s and item %s", claim_id, user_id, found_item_id)
             
             # Log automatic approval for non-valuable items
             if not is_valuable:
-                _logger.info(f"Non-valuable item automatically approved: claim_id={claim_id}, item_id={found_item_id}, user_id={user_id}")
+                _logger.info("Non-valuable item automatically approved: claim_id=%s, item_id=%s, user_id=%s", claim_id, found_item_id, user_id)
             else:
-                _logger.info(f"Valuable item claim created, awaiting admin approval: claim_id={claim_id}, item_id={found_item_id}, user_id={user_id}")
+                _logger.info("Valuable item claim created, awaiting admin approval: claim_id=%s, item_id=%s, user_id=%s", claim_id, found_item_id, user_id)
 
             # Release the per-user session lock once the claim has been created.
             # Rationale:
@@ -263,7 +520,7 @@ def start_claim(user_id: str, found_item_id: str, student_remarks: str | None =
         except Exception as create_err:
             # Release session lock on creation failure
             ClaimValidationService.release_user_session_lock(user_id)
-            _logger.error(f"Claim creation failed: {str(create_err)}")
+            _logger.error("Claim creation failed: %s", create_err)
             return False, {
                 'error': 'Failed to create claim',
                 'code': 'CLAIM_CREATION_FAILED'
@@ -272,117 +529,192 @@ def start_claim(user_id: str, found_item_id: str, student_remarks: str | None =
     except Exception as e:
         # Release session lock on unexpected error
         ClaimValidationService.release_user_session_lock(user_id)
-        _logger.error(f"Unexpected error in start_claim: {str(e)}")
+        _logger.error("Unexpected error in start_claim: %s", e)
         return False, {'error': 'Internal server error during claim creation'}, 500
 
-def save_face_image_for_claim(claim_id: str, data_url: str, upload_folder: str):
+# Verification methods a student can choose for a claim
+_VERIFICATION_METHODS = {'qr_face', 'qr_rfid'}
+
+# Largest raw face capture accepted by save_face_image_for_claim_raw
+FACE_UPLOAD_MAX_BYTES = 2 * 1024 * 1024
+
+def _face_image_extension(img_bytes: bytes):
+    """Return the storage extension for a JPEG, PNG or WebP image, detected from its bytes; None otherwise."""
+    if img_bytes.startswith(b'\xff\xd8\xff'):
+        return 'jpg'
+    if img_bytes.startswith(b'\x89PNG\r\n\x1a\n'):
+        return 'png'
+    if img_bytes[:4] == b'RIFF' and img_bytes[8:12] == b'WEBP':
+        return 'webp'
+    return None
+
+def save_face_image_for_claim(claim_id: str, data_url: str, upload_folder: str, verification_method: str | None = None):
     """
     Save canvas-captured face image (data URL) and store a computed face embedding on the claim.
     For free-tier compatibility, we DO NOT require Firebase Storage; instead we compute a lightweight
     embedding from the image and save it to 'face_embedding'.
+    If verification_method is given it is stored in the same write, saving a separate
+    set_verification_method call.
 
     Returns: (success, response, status_code)
     """
+    if verification_method is not None and verification_method not in _VERIFICATION_METHODS:
+        return False, {'error': 'Invalid method'}, 400
+    # Extract base64 from data URL
+    if not data_url or not data_url.startswith('data:image'):
+        return False, {'error': 'Invalid face image data'}, 400
     try:
-        # Validate claim exists
-        claim_ref = db.collection('claims').document(claim_id)
-        claim_doc = claim_ref.get()
-        if not claim_doc.exists:
-            return False, {'error': 'Claim not found'}, 404
+        header, b64 = data_url.split(',', 1)
+    except Exception:
+        return False, {'error': 'Invalid face image data (malformed data URL)'}, 400
+    try:
+        img_bytes = base64.b64decode(b64)
+    except Exception as de:
+        return False, {'error': f'Invalid face image data (base64 decode failed): {str(de)}'}, 400
+    _logger.info('Capture received for claim %s (data_url_len=%d, bytes=%d)', claim_id, len(data_url), len(img_bytes))
 
-        # Extract base64 from data URL
-        if not data_url or not data_url.startswith('data:image'):
-            return False, {'error': 'Invalid face image data'}, 400
-        try:
-            header, b64 = data_url.split(',', 1)
-        except Exception:
-            return False, {'error': 'Invalid face image data (malformed data URL)'}, 400
-        try:
-            img_bytes = base64.b64decode(b64)
-        except Exception as de:
-            return False, {'error': f'Invalid face image data (base64 decode failed): {str(de)}'}, 400
-        _logger.info('Capture received for claim %s (data_url_len=%d, bytes=%d)', claim_id, len(data_url), len(img_bytes))
+    # Keep storing the data URL itself for existing readers of face_image_base64
+    return _save_face_capture(claim_id, img_bytes, lambda: (True, {'face_image_base64': data_url}), verification_method)
+
+def save_face_image_for_claim_raw(claim_id: str, img_bytes: bytes, student_id: str,
+                                  verification_method: str | None = None):
+    """
+    Save a face image uploaded as raw bytes (multipart/form-data) and store its embedding on the claim.
+    Skips the base64 round trip: the bytes go straight to Firebase Storage and the image URL is saved in
+    'face_image_base64', the field every face-image reader uses (upload_bytes_to_storage falls back to
+    a data URL when Storage is unavailable, so the field always holds a usable image src).
+    The image format is detected from the bytes (JPEG, PNG or WebP only) and the claim must belong
+    to student_id. verification_method behaves as in save_face_image_for_claim.
+
+    Returns: (success, response, status_code)
+    """
+    if verification_method is not None and verification_method not in _VERIFICATION_METHODS:
+        return False, {'error': 'Invalid method'}, 400
+    if not img_bytes:
+        return False, {'error': 'Invalid face image data'}, 400
+    if len(img_bytes) > FACE_UPLOAD_MAX_BYTES:
+        return False, {'error': 'Image too large (max 2MB)'}, 413
+    ext = _face_image_extension(img_bytes)
+    if not ext:
+        return False, {'error': 'Invalid face image type (JPEG, PNG or WebP required)'}, 400
+    _logger.info('Capture received for claim %s (bytes=%d, format=%s)', claim_id, len(img_bytes), ext)
+
+    def _store_image():
+        ok, url_or_err = upload_bytes_to_storage(img_bytes, folder_name='claim_faces', file_extension=ext)
+        if not ok:
+            return False, url_or_err
+        return True, {'face_image_base64': url_or_err}
+
+    return _save_face_capture(claim_id, img_bytes, _store_image, verification_method, student_id=student_id)
 
+def _save_face_capture(claim_id: str, img_bytes: bytes, store_image, verification_method: str | None = None,
+                       student_id: str | None = None):
+    """
+    Compute, validate and store the face embedding for a claim from encoded image bytes.
+    `store_image` is called only once the capture passes validation and returns
+    (ok, fields_to_update_or_error). A validated verification_method is written in the same update.
+    When student_id is given the claim must belong to that student.
+
+    Returns: (success, response, status_code)
+    """
+    try:
+        # Validate claim exists (served from the short-lived claim cache when possible)
+        ok_claim, claim_data, claim_status = _get_claim_data_cached(claim_id)
+        if not ok_claim:
+            return False, claim_data, claim_status
+        if student_id is not None and claim_data.get('student_id') != student_id:
+            return False, {'error': 'Forbidden: claim does not belong to user'}, 403
+        claim_ref = _CLAIMS.document(claim_id)
+
+        # Use claim data to check if this is a valuable item
+        found_item_id = claim_data.get('found_item_id')
+        
+        # Check if item is valuable to determine validation strictness.
+        # Claims created since is_valuable was denormalized carry it; older ones read the item.
+        is_valuable = False
+        if 'is_valuable' in claim_data:
+            is_valuable = bool(claim_data.get('is_valuable'))
+        elif found_item_id:
+            try:
+                item_ref = _FOUND_ITEMS.document(found_item_id)
+                item_doc = item_ref.get(field_paths=['is_valuable'])
+                if item_doc.exists:
+                    item_data = item_doc.to_dict() or {}
+                    is_valuable = item_data.get('is_valuable', False)
+            except Exception as item_err:
+                _logger.warning('Could not determine item value for claim %s: %s', claim_id, str(item_err))
+                # Default to strict validation if can't determine
+                is_valuable = True
+        
         # Helper: compute 256-dim LBP histogram embedding using OpenCV
         def _lbp_embedding(gray: np.ndarray) -> list:
             # Resize to a small canonical size for stability
             try:
-                gray_small = cv2.resize(gray, (64, 64), interpolation=cv2.INTER_AREA)
+                gray_small = cv2.resize(gray, (64, 64), dst=_scratch_64(), interpolation=cv2.INTER_AREA)
             except Exception:
                 # Fallback to numpy resizing if OpenCV resize fails
                 gray_small = np.array(Image.fromarray(gray).resize((64, 64))).astype(np.uint8)
-            h, w = gray_small.shape
-            hist = np.zeros(256, dtype=np.float32)
-            # Compute basic 8-neighbor LBP code
-            for i in range(1, h - 1):
-                row_up = gray_small[i - 1]
-                row = gray_small[i]
-                row_dn = gray_small[i + 1]
-                for j in range(1, w - 1):
-                    c = int(row[j])
-                    code = 0
-                    code |= (int(row_up[j - 1]) >= c) << 7
-                    code |= (int(row_up[j]) >= c) << 6
-                    code |= (int(row_up[j + 1]) >= c) << 5
-                    code |= (int(row[j + 1]) >= c) << 4
-                    code |= (int(row_dn[j + 1]) >= c) << 3
-                    code |= (int(row_dn[j]) >= c) << 2
-                    code |= (int(row_dn[j - 1]) >= c) << 1
-                    code |= (int(row[j - 1]) >= c) << 0
-                    hist[code] += 1.0
-            total = float(hist.sum())
-            if total > 0:
-                hist /= total
-            # Round to 6 decimals for compact storage
-            return [round(float(v), 6) for v in hist.tolist()]
+            hist = _lbp_histogram(np.ascontiguousarray(gray_small, dtype=np.uint8))
+            # Store raw bin counts (at most 62*62 per bin) as integers: lossless and far more
+            # compact than rounded floats. The total is kept as embedding_scale so consumers can
+            # renormalize; cosine comparison is scale-invariant and needs no change.
+            return hist.astype(np.uint16).tolist()
 
         # Compute embedding: prefer DeepFace, then OpenCV LBP, finally PIL fallback.
         # Track processing time for performance metrics.
-        import time
         t_start = time.perf_counter()
         embedding = None
-        try:
-            # Try DeepFace if available
-            from deepface import DeepFace  # optional heavy dependency
-            _logger.info('DeepFace available; attempting to compute embedding for claim %s', claim_id)
-            # Persist bytes to a temp file for DeepFace
-            import tempfile
-            with tempfile.NamedTemporaryFile(suffix='.png', delete=False) as tmp:
-                tmp.write(img_bytes)
-                temp_path = tmp.name
+        # Full-resolution BGR decode shared by DeepFace and, if DeepFace fails, the OpenCV path
+        bgr_full = None
+        if _DEEPFACE_AVAILABLE:
             try:
+                _logger.info('DeepFace available; attempting to compute embedding for claim %s', claim_id)
+                # DeepFace accepts an ndarray directly, so no temp file is needed
+                bgr_full = cv2.imdecode(np.frombuffer(img_bytes, dtype=np.uint8), cv2.IMREAD_COLOR)
+                if bgr_full is None:
+                    raise ValueError('Failed to decode image')
                 # Use a lightweight model to balance performance; Facenet512 returns 512-dim
                 # Detector backend set to 'opencv' to reduce extra heavy dependencies
-                reps = DeepFace.represent(img_path=temp_path, model_name='Facenet512', detector_backend='opencv', enforce_detection=False)
+                _ensure_deepface_model()
+                reps = _DEEPFACE.represent(img_path=bgr_full, model_name='Facenet512', detector_backend='opencv', enforce_detection=False)
                 if isinstance(reps, list) and len(reps) > 0 and isinstance(reps[0], dict):
                     vec = reps[0].get('embedding') or reps[0].get('facial_embedding')
                     if isinstance(vec, (list, tuple, np.ndarray)):
                         # Round to 6 decimals for compact storage
-                        embedding = [round(float(v), 6) for v in (vec.tolist() if isinstance(vec, np.ndarray) else list(vec))]
-            finally:
-                try:
-                    os.remove(temp_path)
-                except Exception:
-                    pass
-        except Exception as e:
-            # DeepFace not installed or failed; continue with OpenCV/PIL
-            _logger.info('DeepFace embedding not used for claim %s: %s', claim_id, str(e))
+                        embedding = np.round(np.asarray(vec, dtype=np.float64), 6).tolist()
+            except Exception as e:
+                # DeepFace failed; continue with OpenCV/PIL
+                _logger.info('DeepFace embedding not used for claim %s: %s', claim_id, str(e))
 
         # If DeepFace failed, fall back to OpenCV LBP embedding
         face_detected = False
+        det_area_ratio = 0.0
+        embedding_scale = None
         if embedding is None:
             if _OPENCV_AVAILABLE:
                 try:
                     np_arr = np.frombuffer(img_bytes, dtype=np.uint8)
-                    bgr = cv2.imdecode(np_arr, cv2.IMREAD_COLOR)
-                    if bgr is None:
+                    bgr = None
+                    decode_factor = 1
+                    if bgr_full is not None:
+                        # Already decoded for DeepFace; reuse it instead of decoding again
+                        bgr = bgr_full
+                        gray = cv2.cvtColor(bgr, cv2.COLOR_BGR2GRAY)
+                    elif _get_yunet() is not None:
+                        # The DNN detector wants color input; the LBP path only needs grayscale
+                        bgr = cv2.imdecode(np_arr, cv2.IMREAD_COLOR)
+                        gray = cv2.cvtColor(bgr, cv2.COLOR_BGR2GRAY) if bgr is not None else None
+                    else:
+                        # Decode straight to half-resolution grayscale: libjpeg scales in the DCT
+                        # domain, skipping the BGR buffer, the conversion and most of the IDCT work.
+                        # Ratios (detection area, brightness) are unaffected by the uniform scale.
+                        gray = cv2.imdecode(np_arr, cv2.IMREAD_REDUCED_GRAYSCALE_2)
+                        decode_factor = 2
+                    if gray is None:
                         raise ValueError('Failed to decode image')
-                    # Convert to grayscale
-                    gray = cv2.cvtColor(bgr, cv2.COLOR_BGR2GRAY)
                     # Attempt face detection
-                    faces = []
                     try:
-                        faces = _FACE_CASCADE.detectMultiScale(gray, scaleFactor=1.2, minNeighbors=5, minSize=(60, 60))
+                        faces = _detect_faces(gray, bgr, min_size=60 // decode_factor)
                     except Exception:
                         faces = []
                     roi_gray = None
@@ -396,21 +728,30 @@ def save_face_image_for_claim(claim_id: str, data_url: str, upload_folder: str):
                         y0 = max(0, y - my)
                         x1 = min(gray.shape[1], x + w + mx)
                         y1 = min(gray.shape[0], y + h + my)
-                        roi_gray = gray[y0:y1, x0:x1]
                         face_detected = True
-                        # Detection area ratio as a proxy for confidence/framing accuracy
-                        try:
-                            frame_area = float(gray.shape[0] * gray.shape[1])
-                            roi_area = float(max(1, roi_gray.shape[0] * roi_gray.shape[1]))
-                            det_area_ratio = float(min(1.0, roi_area / max(1.0, frame_area)))
-                        except Exception:
-                            det_area_ratio = 0.0
+                        # Detection area ratio (margin-padded face box over frame) as a proxy for framing
+                        det_area_ratio = min(1.0, ((x1 - x0) * (y1 - y0)) / float(gray.shape[0] * gray.shape[1]))
+                        # Reject a too-small face before spending time on quality checks and the embedding.
+                        # Strict for valuable items, very lenient otherwise.
+                        min_ratio = _MIN_DET_AREA_RATIO_VALUABLE if is_valuable else _MIN_DET_AREA_RATIO
+                        if det_area_ratio < min_ratio:
+                            _logger.warning('Rejecting capture due to small detection area ratio for %s item claim %s (ratio=%.4f)',
+                                            'valuable' if is_valuable else 'non-valuable', claim_id, det_area_ratio)
+                            return False, {
+                                'error': 'Face too small in frame; move closer and retry',
+                                'details': { 'detection_area_ratio': det_area_ratio }
+                            }, 422
+                        roi_gray = gray[y0:y1, x0:x1]
                         # Server-side basic quality checks: brightness and blur
                         try:
                             # Brightness (mean intensity)
                             mean_brightness = float(np.mean(roi_gray))
-                            # Blur measure: variance of Laplacian
-                            lap_var = float(cv2.Laplacian(roi_gray, cv2.CV_64F).var())
+                            # Blur measure: variance of a 16-bit Laplacian over the ROI capped at 128x128
+                            roi_q = roi_gray
+                            if roi_gray.shape[0] > 128 or roi_gray.shape[1] > 128:
+                                roi_q = cv2.resize(roi_gray, (128, 128), interpolation=cv2.INTER_AREA)
+                            lap = cv2.Laplacian(roi_q, cv2.CV_16S, ksize=3)
+                            lap_var = float(lap.var(dtype=np.float64))
                             # Minimum heuristic thresholds
                             if mean_brightness < 40 or lap_var < 50:
                                 _logger.warning('Low-quality face capture for claim %s (brightness=%.2f, blur=%.2f)', claim_id, mean_brightness, lap_var)
@@ -429,42 +770,27 @@ def save_face_image_for_claim(claim_id: str, data_url: str, upload_folder: str):
                         y0 = max(0, cy - half)
                         x1 = min(w, cx + half)
                         y1 = min(h, cy + half)
-                        roi_gray = gray[y0:y1, x0:x1]
                         # When no face is detected, area ratio is small and considered low-confidence
-                        try:
-                            frame_area = float(gray.shape[0] * gray.shape[1])
-                            roi_area = float(max(1, roi_gray.shape[0] * roi_gray.shape[1]))
-                            det_area_ratio = float(min(1.0, roi_area / max(1.0, frame_area)))
-                        except Exception:
-                            det_area_ratio = 0.0
+                        det_area_ratio = min(1.0, ((x1 - x0) * (y1 - y0)) / float(h * w))
+                        roi_gray = gray[y0:y1, x0:x1]
                     # Equalize and embed
                     try:
-                        roi_gray = cv2.equalizeHist(roi_gray)
+                        # In place: the ROI is a view into the decoded frame, which is not reused
+                        roi_gray = cv2.equalizeHist(roi_gray, dst=roi_gray)
                     except Exception:
                         pass
                     embedding = _lbp_embedding(roi_gray)
+                    embedding_scale = int(sum(embedding))
                 except Exception as embed_err:
                     # Fallback to PIL strategy if OpenCV fails
                     try:
-                        from io import BytesIO
-                        buf = BytesIO(img_bytes)
-                        img = Image.open(buf).convert('L')  # grayscale
-                        img = img.resize((16, 16))
-                        pixels = list(img.getdata())
-                        max_val = 255.0
-                        embedding = [round(p / max_val, 6) for p in pixels]
+                        embedding = _pil_downsample_embedding(img_bytes)
                     except Exception:
                         return False, {'error': f'Failed to compute face embedding: {str(embed_err)}'}, 500
             else:
                 # Compute a simple deterministic embedding using PIL downsampling when OpenCV is unavailable
                 try:
-                    from io import BytesIO
-                    buf = BytesIO(img_bytes)
-                    img = Image.open(buf).convert('L')  # grayscale
-                    img = img.resize((16, 16))
-                    pixels = list(img.getdata())
-                    max_val = 255.0
-                    embedding = [round(p / max_val, 6) for p in pixels]  # 256-dim vector
+                    embedding = _pil_downsample_embedding(img_bytes)  # 256-dim vector
                 except Exception as embed_err:
                     return False, {'error': f'Failed to compute face embedding: {str(embed_err)}'}, 500
 
@@ -473,37 +799,24 @@ def save_face_image_for_claim(claim_id: str, data_url: str, upload_folder: str):
         proc_ms = int((t_end - t_start) * 1000)
 
         try:
-            arr = np.array(embedding, dtype=np.float32).reshape(-1)
+            arr = np.asarray(embedding, dtype=np.float32).reshape(-1)
             dim = int(arr.shape[0])
             nonzero = int(np.count_nonzero(arr))
             zero_ratio = float((dim - nonzero) / max(1, dim))
-            norm = float(np.linalg.norm(arr))
-            mean_val = float(np.mean(arr))
-            std_val = float(np.std(arr))
-            has_nan = bool(np.isnan(arr).any())
-            has_inf = bool(np.isinf(arr).any())
+            # One finiteness pass covers NaN and Inf; mean/std/norm derive from two sums
+            has_nan = has_inf = not bool(np.isfinite(arr).all())
+            if has_nan or dim == 0:
+                norm = mean_val = std_val = 0.0
+            else:
+                s1 = float(arr.sum(dtype=np.float64))
+                s2 = float(np.einsum('i,i->', arr, arr, dtype=np.float64))
+                mean_val = s1 / dim
+                std_val = math.sqrt(max(0.0, s2 / dim - mean_val * mean_val))
+                norm = math.sqrt(s2)
         except Exception as qerr:
             _logger.error('Embedding quality eval failed for claim %s: %s', claim_id, str(qerr))
             return False, {'error': 'Invalid embedding data'}, 500
 
-        # Get claim data to check if this is a valuable item
-        claim_data = claim_doc.to_dict() or {}
-        found_item_id = claim_data.get('found_item_id')
-        
-        # Check if item is valuable to determine validation strictness
-        is_valuable = False
-        if found_item_id:
-            try:
-                item_ref = db.collection('found_items').document(found_item_id)
-                item_doc = item_ref.get()
-                if item_doc.exists:
-                    item_data = item_doc.to_dict() or {}
-                    is_valuable = item_data.get('is_valuable', False)
-            except Exception as item_err:
-                _logger.warning('Could not determine item value for claim %s: %s', claim_id, str(item_err))
-                # Default to strict validation if can't determine
-                is_valuable = True
-        
         # Validate numeric integrity and non-triviality
         if has_nan or has_inf:
             return False, {'error': 'Embedding contains invalid values'}, 422
@@ -536,28 +849,6 @@ def save_face_image_for_claim(claim_id: str, data_url: str, upload_folder: str):
                     }
                 }, 422
         
-        # Additional framing/detection validation when OpenCV was used
-        try:
-            det_ratio_val = float(locals().get('det_area_ratio', 0.0))
-            if is_valuable:
-                # Strict validation for valuable items
-                if _OPENCV_AVAILABLE and det_ratio_val < 0.07:
-                    _logger.warning('Rejecting capture due to small detection area ratio for valuable item claim %s (ratio=%.4f)', claim_id, det_ratio_val)
-                    return False, {
-                        'error': 'Face too small in frame; move closer and retry',
-                        'details': { 'detection_area_ratio': det_ratio_val }
-                    }, 422
-            else:
-                # Very lenient validation for non-valuable items - only reject if face is extremely small
-                if _OPENCV_AVAILABLE and det_ratio_val < 0.02:
-                    _logger.warning('Rejecting capture due to very small detection area ratio for non-valuable item claim %s (ratio=%.4f)', claim_id, det_ratio_val)
-                    return False, {
-                        'error': 'Face too small in frame; move closer and retry',
-                        'details': { 'detection_area_ratio': det_ratio_val }
-                    }, 422
-        except Exception:
-            pass
-
         # Update claim doc with embedding and raw base64 image (Data URL)
         # Warning: Storing large images in Firestore can exceed document size limits (~1 MiB).
         # Keep capture resolution reasonable on the client (e.g., 640x480) to avoid oversized documents.
@@ -567,7 +858,7 @@ def save_face_image_for_claim(claim_id: str, data_url: str, upload_folder: str):
             'opencv_available': _OPENCV_AVAILABLE,
             'opencv_version': _OPENCV_VERSION or 'unknown',
             'face_detected': face_detected,
-            'detection_area_ratio': round(float(locals().get('det_area_ratio', 0.0)), 6),
+            'detection_area_ratio': round(float(det_area_ratio), 6),
             'embedding_dim': int(len(embedding) if embedding else 0),
             'embedding_nonzero': nonzero,
             'embedding_zero_ratio': round(zero_ratio, 6),
@@ -576,14 +867,26 @@ def save_face_image_for_claim(claim_id: str, data_url: str, upload_folder: str):
             'embedding_std': round(std_val, 6)
         }
 
-        # Update only fields defined in the sample claim structure
-        claim_ref.update({
+        # Store the image only after the capture is accepted
+        ok_img, image_fields = store_image()
+        if not ok_img:
+            return False, {'error': f'Failed to store face image: {image_fields}'}, 500
+
+        # Update only the face capture fields of the claim structure
+        updates = {
             'face_embedding': embedding,
-            'face_image_base64': data_url,
-        })
+            # Sum of LBP counts when the embedding is a raw histogram; None for normalized vectors
+            'embedding_scale': embedding_scale,
+        }
+        updates.update(image_fields)
+        if verification_method:
+            updates['verification_method'] = verification_method
+        claim_ref.update(updates)
+        clear_claim_cache(claim_id)
 
         _logger.info('Saved face embedding for claim %s (dim=%d, face_detected=%s)', claim_id, len(embedding) if embedding else 0, str(face_detected))
-        _logger.info('Face capture metrics for claim %s (returned to client only): %s', claim_id, metrics)
+        if _logger.isEnabledFor(logging.INFO):
+            _logger.info('Face capture metrics for claim %s (returned to client only): %s', claim_id, metrics)
         return True, {
             'success': True,
             'embedding_dim': len(embedding),
@@ -598,19 +901,158 @@ def save_face_image_for_claim(claim_id: str, data_url: str, upload_folder: str):
 def set_verification_method(claim_id: str, method: str):
     """Update verification method for a claim."""
     try:
-        claim_ref = db.collection('claims').document(claim_id)
+        claim_ref = _CLAIMS.document(claim_id)
         if not claim_ref.get().exists:
             return False, {'error': 'Claim not found'}, 404
         # Validate method
-        allowed = {'qr_face', 'qr_rfid'}
-        if method not in allowed:
+        if method not in _VERIFICATION_METHODS:
             return False, {'error': 'Invalid method'}, 400
         # Per request: remove method_selected_at attribute; only store the selected method
         claim_ref.update({'verification_method': method})
+        clear_claim_cache(claim_id)
         return True, {'success': True}, 200
     except Exception as e:
         return False, {'error': str(e)}, 500
 
+def _get_found_item_cached(found_item_id: str, _cache: dict, fields: list | None = None):
+    """Read found_items/{found_item_id} at most once per call path.
+    `_cache` is a dict owned by the caller; returns the item data, or None if the item is missing.
+    `fields` projects the read server-side; a call path should pass every field it needs
+    on each call, since the first read is what gets cached.
+    """
+    if found_item_id not in _cache:
+        ref = _FOUND_ITEMS.document(found_item_id)
+        snap = ref.get(field_paths=fields) if fields else ref.get()
+        _cache[found_item_id] = (snap.to_dict() or {}) if snap.exists else None
+    return _cache[found_item_id]
+
+# Firestore caps batched lookups; keep each get_all at the 'in' query limit
+_ITEM_BATCH_SIZE = 30
+# Fan-out pool for independent Firestore reads; kept apart from the side-effect pool so reads never queue behind SMTP work
+_READ_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix='claim-reads')
+# found_items fields shown next to a claim in listings
+_ITEM_DISPLAY_FIELDS = ['found_item_name', 'name', 'image_url', 'images', 'is_valuable', 'valuable']
+
+def _fetch_found_items(found_item_ids, fields: list | None = None) -> dict:
+    """Batch-read found_items by ID with db.get_all, 30 refs per round-trip.
+    Returns {found_item_id: item_data} for the items that exist.
+    """
+    ids = list(dict.fromkeys(fid for fid in found_item_ids if fid))
+    chunks = [ids[start:start + _ITEM_BATCH_SIZE] for start in range(0, len(ids), _ITEM_BATCH_SIZE)]
+
+    def _fetch_chunk(chunk):
+        refs = [_FOUND_ITEMS.document(fid) for fid in chunk]
+        return [(snap.id, snap.to_dict() or {}) for snap in db.get_all(refs, field_paths=fields) if snap.exists]
+
+    # Collect every key first, then issue the chunks concurrently rather than one after another
+    if len(chunks) > 1:
+        results = list(_READ_EXECUTOR.map(_fetch_chunk, chunks))
+    else:
+        results = [_fetch_chunk(chunk) for chunk in chunks]
+    items_by_id = {}
+    for rows in results:
+        items_by_id.update(rows)
+    return items_by_id
+
+# Process-wide TTL cache of found_items read by claim listings, QR lookups and QR verification
+_FOUND_ITEM_CACHE = OrderedDict()
+_FOUND_ITEM_CACHE_TTL_SECONDS = 60
+_FOUND_ITEM_CACHE_MAXSIZE = 2048
+_FOUND_ITEM_CACHE_LOCK = threading.RLock()
+_FOUND_ITEM_CACHE_FIELDS = _ITEM_DISPLAY_FIELDS + ['face_embedding', 'rfid_uid']
+
+def _get_found_items_cached(found_item_ids) -> dict:
+    """Return {found_item_id: item_data} for existing items, projected to _FOUND_ITEM_CACHE_FIELDS.
+    Cached entries are served from memory; misses share one batched read and are cached.
+    """
+    ids = list(dict.fromkeys(fid for fid in found_item_ids if fid))
+    now = time.monotonic()
+    items_by_id = {}
+    with _FOUND_ITEM_CACHE_LOCK:
+        for fid in ids:
+            cached = _FOUND_ITEM_CACHE.get(fid)
+            if cached:
+                if now - cached['ts'] < _FOUND_ITEM_CACHE_TTL_SECONDS:
+                    _FOUND_ITEM_CACHE.move_to_end(fid)
+                    items_by_id[fid] = cached['doc']
+                    continue
+                del _FOUND_ITEM_CACHE[fid]
+    missing = [fid for fid in ids if fid not in items_by_id]
+    if missing:
+        fetched = _fetch_found_items(missing, fields=_FOUND_ITEM_CACHE_FIELDS)
+        with _FOUND_ITEM_CACHE_LOCK:
+            for fid, data in fetched.items():
+                _FOUND_ITEM_CACHE[fid] = {'doc': data, 'ts': now}
+                _FOUND_ITEM_CACHE.move_to_end(fid)
+            while len(_FOUND_ITEM_CACHE) > _FOUND_ITEM_CACHE_MAXSIZE:
+                _FOUND_ITEM_CACHE.popitem(last=False)
+        items_by_id.update(fetched)
+    return items_by_id
+
+def _get_found_item(found_item_id: str):
+    """Cached single-item lookup; returns the projected item data, or None if the item is missing."""
+    if not found_item_id:
+        return None
+    return _get_found_items_cached([found_item_id]).get(found_item_id)
+
+def invalidate_found_item_cache(found_item_id: str | None = None):
+    """Drop a found item (or all items if None) from the process-wide cache after it changes."""
+    try:
+        with _FOUND_ITEM_CACHE_LOCK:
+            if found_item_id:
+                _FOUND_ITEM_CACHE.pop(found_item_id, None)
+            else:
+                _FOUND_ITEM_CACHE.clear()
+    except Exception:
+        pass
+
+def _item_display_fields(item_data: dict | None):
+    """Return (item_name, item_image_url, is_valuable) for a claim listing row."""
+    if item_data is None:
+        return None, None, None
+    item_name = item_data.get('found_item_name') or item_data.get('name')
+    item_image_url = item_data.get('image_url') or (item_data.get('images', []) or [None])[0]
+    is_valuable = bool(item_data.get('is_valuable') or item_data.get('valuable') or False)
+    return item_name, item_image_url, is_valuable
+
+def _claim_item_display(claim_data: dict, items_by_id: dict):
+    """Item display fields for a claim: the copies start_claim stores on the claim,
+    or the batched item read for legacy claims created before they were denormalized.
+    """
+    if 'item_name' in claim_data:
+        return claim_data.get('item_name'), claim_data.get('item_image_url'), claim_data.get('is_valuable')
+    return _item_display_fields(items_by_id.get(claim_data.get('found_item_id')))
+
+def _legacy_item_ids(claim_rows):
+    """found_item_ids of claims that lack the denormalized item fields."""
+    return (data.get('found_item_id') for data in claim_rows if 'item_name' not in data)
+
+_CLAIM_BATCH_LIMIT = 500  # Firestore's per-commit write limit
+
+def refresh_claim_item_fields(found_item_id: str, item_data: dict) -> int:
+    """Rewrite the denormalized item fields on every claim for a found item after it changes.
+    Returns the number of claims updated.
+    """
+    if not found_item_id:
+        return 0
+    item_name, item_image_url, is_valuable = _item_display_fields(item_data)
+    # Only document references are needed; an empty projection skips the claim bodies
+    refs = [d.reference for d in _CLAIMS.where('found_item_id', '==', found_item_id).select([]).stream()]
+    for start in range(0, len(refs), _CLAIM_BATCH_LIMIT):
+        batch = db.batch()
+        for ref in refs[start:start + _CLAIM_BATCH_LIMIT]:
+            batch.update(ref, {
+                'item_name': item_name,
+                'item_image_url': item_image_url,
+                'is_valuable': is_valuable,
+            })
+        batch.commit()
+    for ref in refs:
+        clear_claim_cache(ref.id)
+    if refs:
+        _logger.info('Refreshed item fields on %d claims for found_item=%s', len(refs), found_item_id)
+    return len(refs)
+
 def finalize_claim(claim_id: str):
     """
     Finalize a claim before QR generation (student-side flow).
@@ -623,11 +1065,15 @@ def finalize_claim(claim_id: str):
     - No longer records finalized_at (removed from schema)
     - Keeps status as 'pending' to remain compatible with existing QR verification
 
+    Deprecated: this is a read-only check now. generate_claim_qr validates the same
+    fields, so new clients can go straight to QR generation.
+
     Returns: (success, response, status_code)
     """
     try:
-        claim_ref = db.collection('claims').document(claim_id)
-        snap = claim_ref.get()
+        claim_ref = _CLAIMS.document(claim_id)
+        # Only the two validated fields are needed
+        snap = claim_ref.get(field_paths=['face_embedding', 'verification_method'])
         if not snap.exists:
             return False, {'error': 'Claim not found'}, 404
 
@@ -642,19 +1088,36 @@ def finalize_claim(claim_id: str):
             return False, {'error': 'Verification method not selected yet'}, 400
 
         # Do not change status to avoid breaking verify_claim_qr_data (expects 'pending')
-        # Per request: finalized_at removed from schema, so skip writing any additional fields
-        pass
-
-        # Clear short-lived cache to ensure subsequent reads include new fields
-        try:
-            clear_claim_cache(claim_id)
-        except Exception:
-            pass
-
+        # Per request: finalized_at removed from schema, so nothing is written and
+        # there is no cached entry to invalidate
         return True, {'success': True}, 200
     except Exception as e:
         return False, {'error': str(e)}, 500
 
+# Background workers for post-commit side effects (notifications, SMTP email)
+_SIDE_EFFECT_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix='claim-side-effects')
+
+def _dispatch_side_effects(notification: dict, email: tuple | None = None):
+    """Buffer the notification for the next flush and hand the email lookup/enqueue to
+    _SIDE_EFFECT_EXECUTOR without waiting; both swallow their own errors.
+    `email` is (student_id, subject, html, text). The calling public function flushes the
+    buffer once at its end with _flush_notifications_in_background().
+    """
+    try:
+        _create_notification(**notification)
+        if email:
+            _SIDE_EFFECT_EXECUTOR.submit(_queue_trigger_email, *email)
+    except Exception:
+        pass
+
+def _flush_notifications_in_background():
+    """Commit the notification buffer off the request thread. Flushes queued behind one
+    another find the buffer already drained, so concurrent requests share commits."""
+    try:
+        _SIDE_EFFECT_EXECUTOR.submit(flush_notifications)
+    except Exception:
+        pass
+
 def finalize_claim_kiosk(claim_id: str, duration_sec: int = 10):
     """
     Kiosk-side finalize that performs atomic status update and locker opening.
@@ -665,12 +1128,10 @@ def finalize_claim_kiosk(claim_id: str, duration_sec: int = 10):
     - Claim must have face_embedding and verification_method set
 
     Behavior:
-    - If the associated found item has a locker_id:
-        * Open the locker (set status 'open' and auto_close_at)
-        * Mark the claim status to 'completed'
-        * Perform both updates in a single Firestore batch for atomicity
-    - If no locker_id:
-        * Mark the claim status to 'completed'
+    - Mark the claim status to 'completed' and the found item as 'claimed'
+    - If the associated found item has a locker_id, also open the locker
+      (set status 'open' and auto_close_at)
+    - All updates are committed in a single Firestore batch for atomicity
 
     Returns: (success, response, status_code)
     Response includes: verified, claim (id/status), locker (status/id) when applicable
@@ -679,7 +1140,7 @@ def finalize_claim_kiosk(claim_id: str, duration_sec: int = 10):
         if duration_sec <= 0 or duration_sec > 3600:
             duration_sec = 10
 
-        claim_ref = db.collection('claims').document(claim_id)
+        claim_ref = _CLAIMS.document(claim_id)
         snap = claim_ref.get()
         if not snap.exists:
             return False, {'error': 'Claim not found'}, 404
@@ -695,17 +1156,20 @@ def finalize_claim_kiosk(claim_id: str, duration_sec: int = 10):
             return False, {'error': 'Verification method not selected yet'}, 400
 
         # Ensure claim is approved (only approved claims can be finalized at kiosk)
-        status = str(data.get('status', '')).lower()
+        status = data.get('status') or ''
         if status != 'approved':
             return False, {'error': f"Claim status must be 'approved' to finalize at kiosk (got '{status}')"}, 409
 
         found_item_id = data.get('found_item_id')
         locker_id = None
+        item_name = None
+        item_cache = {}
         if found_item_id:
-            item_doc = db.collection('found_items').document(found_item_id).get()
-            if item_doc.exists:
-                item_data = item_doc.to_dict() or {}
+            item_data = _get_found_item_cached(found_item_id, item_cache, fields=['locker_id', 'found_item_name'])
+            if item_data is not None:
                 locker_id = item_data.get('locker_id')
+                # Keep the name for the completion notification instead of re-reading the item
+                item_name = item_data.get('found_item_name')
 
         # Prepare response payload
         resp_payload = {
@@ -717,9 +1181,27 @@ def finalize_claim_kiosk(claim_id: str, duration_sec: int = 10):
             }
         }
 
+        # Claim, found item and (when assigned) locker updates commit together in one batch
+        batch = db.batch()
+        # Update claim status to completed
+        batch.update(claim_ref, {
+            'status': 'completed',
+            'completed_at': firestore.SERVER_TIMESTAMP,
+            'updated_at': firestore.SERVER_TIMESTAMP
+        })
+        # Also mark the related found item as claimed
+        if found_item_id:
+            fi_ref = _FOUND_ITEMS.document(found_item_id)
+            batch.update(fi_ref, {
+                'status': 'claimed',
+                'claimed_by': data.get('student_id'),
+                'claimed_at': firestore.SERVER_TIMESTAMP,
+                'updated_at': firestore.SERVER_TIMESTAMP
+            })
+
         # If locker assigned, open it and set auto_close_at in the same batch as claim status update
         if locker_id:
-            locker_ref = db.collection('lockers').document(locker_id)
+            locker_ref = _LOCKERS.document(locker_id)
             locker_snap = locker_ref.get()
             if not locker_snap.exists:
                 return False, {'error': 'Locker not found'}, 404
@@ -731,25 +1213,8 @@ def finalize_claim_kiosk(claim_id: str, duration_sec: int = 10):
                 return False, {'error': 'Only occupied lockers can be opened'}, 400
 
             # Compute auto-close timestamp
-            import datetime as _dt
-            close_at = _dt.datetime.utcnow() + _dt.timedelta(seconds=duration_sec)
-
-            batch = db.batch()
-            # Update claim status to completed
-            batch.update(claim_ref, {
-                'status': 'completed',
-                'completed_at': firestore.SERVER_TIMESTAMP,
-                'updated_at': firestore.SERVER_TIMESTAMP
-            })
-            # Also mark the related found item as claimed
-            if found_item_id:
-                fi_ref = db.collection('found_items').document(found_item_id)
-                batch.update(fi_ref, {
-                    'status': 'claimed',
-                    'claimed_by': data.get('student_id'),
-                    'claimed_at': firestore.SERVER_TIMESTAMP,
-                    'updated_at': firestore.SERVER_TIMESTAMP
-                })
+            close_at = datetime.utcnow() + timedelta(seconds=duration_sec)
+
             # Open locker with auto-close metadata
             batch.update(locker_ref, {
                 'status': 'open',
@@ -758,58 +1223,45 @@ def finalize_claim_kiosk(claim_id: str, duration_sec: int = 10):
                 'auto_close_at': close_at,
                 'updated_at': firestore.SERVER_TIMESTAMP
             })
-            batch.commit()
 
             resp_payload['locker'] = {
                 'locker_id': locker_id,
                 'status': 'open',
                 'auto_close_at': close_at.isoformat() + 'Z'
             }
-        else:
-            # No locker assigned — just mark claim as completed
-            claim_ref.update({
-                'status': 'completed',
-                'completed_at': firestore.SERVER_TIMESTAMP,
-                'updated_at': firestore.SERVER_TIMESTAMP
-            })
-            # Also mark the related found item as claimed
-            if found_item_id:
-                db.collection('found_items').document(found_item_id).update({
-                    'status': 'claimed',
-                    'claimed_by': data.get('student_id'),
-                    'claimed_at': firestore.SERVER_TIMESTAMP,
-                    'updated_at': firestore.SERVER_TIMESTAMP
-                })
+
+        batch.commit()
 
         # Clear cache so subsequent reads reflect updated state
         try:
             clear_claim_cache(claim_id)
+            if found_item_id:
+                _invalidate_qr_status(found_item_id)
+                invalidate_found_item_cache(found_item_id)
         except Exception:
             pass
 
+        # Notification and email are post-commit side effects; don't hold the kiosk response on them
         try:
-            item_name = None
-            fi = data.get('found_item_id')
-            if fi:
-                idoc = db.collection('found_items').document(fi).get()
-                if idoc.exists:
-                    item_name = (idoc.to_dict() or {}).get('found_item_name')
-            _create_notification(
-                user_id=data.get('student_id'),
-                title='Claim completed',
-                message=f"You have successfully claimed {item_name or 'your item'}",
-                link='/user/claim-history',
-                ntype='claim_success'
+            student_id = data.get('student_id')
+            _dispatch_side_effects(
+                dict(
+                    user_id=student_id,
+                    title='Claim completed',
+                    message=f"You have successfully claimed {item_name or 'your item'}",
+                    link='/user/claim-history',
+                    ntype='claim_success'
+                ),
+                (
+                    student_id,
+                    'Claim completed successfully',
+                    f"<p>You have successfully claimed <strong>{item_name or 'your item'}</strong> at the kiosk.</p>",
+                    f"You have successfully claimed {item_name or 'your item'} at the kiosk.",
+                ),
             )
-            try:
-                subj = 'Claim completed successfully'
-                txt = f"You have successfully claimed {item_name or 'your item'} at the kiosk."
-                html = f"<p>You have successfully claimed <strong>{item_name or 'your item'}</strong> at the kiosk.</p>"
-                _queue_trigger_email(data.get('student_id'), subj, html, txt)
-            except Exception:
-                pass
         except Exception:
             pass
+        _flush_notifications_in_background()
 
         return True, resp_payload, 200
     except Exception as e:
@@ -828,13 +1280,13 @@ def update_claim_status(claim_id: str, new_status: str):
         if desired not in ['completed']:
             return False, {'error': f"Unsupported status '{new_status}'"}, 400
 
-        ref = db.collection('claims').document(claim_id)
+        ref = _CLAIMS.document(claim_id)
         snap = ref.get()
         if not snap.exists:
             return False, {'error': 'Claim not found'}, 404
 
         data = snap.to_dict() or {}
-        current = str(data.get('status', '')).strip().lower()
+        current = data.get('status') or ''
 
         # Enforce simple allowed transition: approved -> completed
         if current != 'approved':
@@ -852,89 +1304,107 @@ def update_claim_status(claim_id: str, new_status: str):
             pass
 
         try:
-            item_name = None
+            item_name = data.get('item_name')
             fi = data.get('found_item_id')
-            if fi:
-                idoc = db.collection('found_items').document(fi).get()
-                if idoc.exists:
-                    item_name = (idoc.to_dict() or {}).get('found_item_name')
-            _create_notification(
+            if item_name is None and fi:
+                item_name = (_get_found_item_cached(fi, {}, fields=['found_item_name']) or {}).get('found_item_name')
+            _dispatch_side_effects(dict(
                 user_id=data.get('student_id'),
                 title='Claim completed',
                 message=f"You have successfully claimed {item_name or 'your item'}",
                 link='/user/claim-history',
                 ntype='claim_success'
-            )
+            ))
         except Exception:
             pass
+        _flush_notifications_in_background()
 
         return True, {'success': True, 'claim_id': claim_id, 'status': 'completed'}, 200
     except Exception as e:
         return False, {'error': str(e)}, 500
 
-def _generate_qr_image(payload: str, upload_folder: str, embed_logo: bool = True, logo_path: str | None = None):
+_QR_BOX_SIZE = 10
+_QR_BORDER = 4
+_DEFAULT_LOGO_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'static', 'images', 'Logo.png'))
+
+@functools.lru_cache(maxsize=4)
+def _load_logo_resized(logo_path: str, target_w: int):
+    """Decode the logo and scale it to `target_w`, keeping aspect ratio.
+    QR geometry is fixed, so in practice this holds a single entry per process.
+    The returned image is shared; callers must not modify it.
+    """
+    logo = Image.open(logo_path).convert('RGBA')
+    ratio = target_w / float(logo.size[0])
+    target_h = int(logo.size[1] * ratio)
+    # Use a high-quality resampling filter for logo scaling
+    return logo.resize((target_w, target_h), Image.LANCZOS)
+
+def _generate_qr_image(payload: str, embed_logo: bool = True, logo_path: str | None = None):
     """
-    Generate a QR image for the payload and save to a temp file.
+    Generate a QR image for the payload and encode it as PNG in memory.
     Tries to use `qrcode` library; if unavailable, falls back to a simple placeholder image.
-    Returns: (success, temp_path_or_error)
+    Returns: (success, png_bytes_or_error)
     """
     try:
-        try:
-            import qrcode
-            qr = qrcode.QRCode(version=1, box_size=10, border=4)
-            qr.add_data(payload)
-            qr.make(fit=True)
-            img = qr.make_image(fill_color='black', back_color='white').convert('RGBA')
-
-            # Optionally embed a logo at the center
-            if embed_logo:
-                try:
-                    # Default logo path under project static/images
-                    if not logo_path:
-                        logo_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'static', 'images', 'Logo.png'))
-                    if os.path.exists(logo_path):
-                        logo = Image.open(logo_path).convert('RGBA')
-                        # Scale logo to ~20% of QR image width
+        if _QRCODE_AVAILABLE:
+            try:
+                qr = qrcode.QRCode(version=1, box_size=_QR_BOX_SIZE, border=_QR_BORDER)
+                qr.add_data(payload)
+                qr.make(fit=True)
+
+                # Default logo path under project static/images
+                if embed_logo and not logo_path:
+                    logo_path = _DEFAULT_LOGO_PATH
+                if embed_logo and os.path.exists(logo_path):
+                    img = qr.make_image(fill_color='black', back_color='white').convert('RGBA')
+                    # Embed a logo at the center
+                    try:
+                        # Scale logo to ~20% of QR image width (decoded and resized once, then cached)
                         qr_w, qr_h = img.size
                         target_w = max(40, int(qr_w * 0.2))
-                        # Maintain aspect ratio
-                        ratio = target_w / float(logo.size[0])
-                        target_h = int(logo.size[1] * ratio)
-                        # Use a high-quality resampling filter for logo scaling
-                        logo = logo.resize((target_w, target_h), Image.LANCZOS)
-                        # Paste centered with alpha
+                        logo = _load_logo_resized(logo_path, target_w)
+                        target_h = logo.size[1]
+                        # Paste centered with alpha; alpha_composite only modifies img
                         pos = ((qr_w - target_w) // 2, (qr_h - target_h) // 2)
                         img.alpha_composite(logo, dest=pos)
-                except Exception:
-                    # If logo embedding fails, continue with plain QR
-                    pass
-
-            # Save to temp path
-            filename = f"qr_{uuid.uuid4().hex}.png"
-            temp_path = os.path.join(upload_folder, filename)
-            img.save(temp_path)
-            return True, temp_path
+                    except Exception:
+                        # If logo embedding fails, continue with plain QR
+                        pass
+                else:
+                    # No logo to composite: rasterize the module matrix (border included) directly
+                    modules = np.asarray(qr.get_matrix(), dtype=bool)
+                    raster = np.where(modules, 0, 255).astype(np.uint8)
+                    raster = raster.repeat(_QR_BOX_SIZE, axis=0).repeat(_QR_BOX_SIZE, axis=1)
+                    img = Image.fromarray(raster, mode='L')
+
+                buf = io.BytesIO()
+                img.save(buf, format='PNG')
+                return True, buf.getvalue()
+            except Exception as e:
+                _logger.warning('QR rendering failed, using placeholder image: %s', str(e))
+        # Fallback: draw text payload into image (not scannable QR, placeholder)
+        img = Image.new('RGB', (400, 400), color=(255, 255, 255))
+        draw = ImageDraw.Draw(img)
+        text = f"QR Token\n{payload[:200]}"
+        # Try to load a default font
+        try:
+            font = ImageFont.load_default()
         except Exception:
-            # Fallback: draw text payload into image (not scannable QR, placeholder)
-            img = Image.new('RGB', (400, 400), color=(255, 255, 255))
-            draw = ImageDraw.Draw(img)
-            text = f"QR Token\n{payload[:200]}"
-            # Try to load a default font
-            try:
-                font = ImageFont.load_default()
-            except Exception:
-                font = None
-            draw.multiline_text((20, 160), text, fill=(0, 0, 0), font=font, align='center')
-            filename = f"qr_{uuid.uuid4().hex}.png"
-            temp_path = os.path.join(upload_folder, filename)
-            img.save(temp_path, format='PNG')
-            return True, temp_path
+            font = None
+        draw.multiline_text((20, 160), text, fill=(0, 0, 0), font=font, align='center')
+        buf = io.BytesIO()
+        img.save(buf, format='PNG')
+        return True, buf.getvalue()
     except Exception as e:
         return False, str(e)
 
+# found_items fields read while generating a claim QR
+_QR_ITEM_FIELDS = ['is_valuable', 'found_item_name']
+
 def generate_claim_qr(claim_id: str, upload_folder: str):
     """
     Generate a time-limited QR code for the claim, upload it to storage, and update the claim.
+    The QR PNG is built in memory; `upload_folder` is no longer written to.
     The QR content is a raw JSON string with required fields only (no URLs):
     {
         "claim_id": "<claim_id>",
@@ -944,13 +1414,16 @@ def generate_claim_qr(claim_id: str, upload_folder: str):
     Returns: (success, response, status_code)
     """
     try:
-        claim_ref = db.collection('claims').document(claim_id)
+        claim_ref = _CLAIMS.document(claim_id)
         claim_doc = claim_ref.get()
         if not claim_doc.exists:
             return False, {'error': 'Claim not found', 'code': 'CLAIM_NOT_FOUND'}, 404
 
-        # Validate claim state before generating QR (predictable client errors should be 4xx)
+        # Validate claim state before generating QR (predictable client errors should be 4xx).
+        # Convert the snapshot once and read every claim field from cdata below.
         cdata = claim_doc.to_dict() or {}
+        student_id = cdata.get('student_id')
+        found_item_id = cdata.get('found_item_id')
         embedding = cdata.get('face_embedding')
         method = cdata.get('verification_method')
 
@@ -967,67 +1440,44 @@ def generate_claim_qr(claim_id: str, upload_folder: str):
             }, 409
         # Per request: do not require finalized_at; proceed when method and face_embedding are set
 
-        # Enforce admin approval for valuable items before QR generation
-        try:
-            found_item_id = cdata.get('found_item_id')
-            if found_item_id:
-                item_doc = db.collection('found_items').document(found_item_id).get()
-                if item_doc.exists:
-                    item_data = item_doc.to_dict() or {}
+        # found_items reads in this call go through one request-scoped cache
+        item_cache = {}
+
+        # Claims created since is_valuable was denormalized carry it; older ones read the item.
+        # None means the value could not be determined (item missing or read failed).
+        is_valuable = None
+        if 'is_valuable' in cdata:
+            is_valuable = bool(cdata.get('is_valuable'))
+        elif found_item_id:
+            try:
+                item_data = _get_found_item_cached(found_item_id, item_cache, fields=_QR_ITEM_FIELDS)
+                if item_data is not None:
                     is_valuable = bool(item_data.get('is_valuable', False))
-                    if is_valuable:
-                        # Require explicit admin approval recorded on the claim
-                        approved_by = cdata.get('approved_by')
-                        status_val = str(cdata.get('status', '')).lower()
-                        if not approved_by and status_val != 'approved':
-                            return False, {
-                                'error': 'Admin approval required before generating QR for valuable item',
-                                'code': 'ADMIN_APPROVAL_REQUIRED'
-                            }, 403
-        except Exception as e:
-            _logger.warning('Valuable item approval precheck failed for claim %s: %s', claim_id, str(e))
+            except Exception as e:
+                _logger.warning('Valuable item approval precheck failed for claim %s: %s', claim_id, str(e))
 
-        # Enforce one active QR per user-item pair: if another active QR exists, block generation
-        try:
-            found_item_id = cdata.get('found_item_id')
-            student_id = cdata.get('student_id')
-            if found_item_id and student_id:
-                now_utc = datetime.now(timezone.utc)
-                query = db.collection('claims').where('found_item_id', '==', found_item_id).where('student_id', '==', student_id).where('qr_token', '!=', None)
-                docs = list(query.stream())
-                for d in docs:
-                    if d.id == claim_id:
-                        continue
-                    dd = d.to_dict() or {}
-                    exp = dd.get('expires_at')
-                    if exp:
-                        try:
-                            exp_dt = exp if isinstance(exp, datetime) else datetime.fromtimestamp(float(exp), tz=timezone.utc)
-                        except Exception:
-                            exp_dt = None
-                        if exp_dt and now_utc < exp_dt:
-                            return False, {
-                                'error': 'Another active QR is already registered for this item for your account',
-                                'code': 'QR_ALREADY_REGISTERED_FOR_USER'
-                            }, 409
-        except Exception as e:
-            _logger.warning('QR uniqueness precheck failed for claim %s: %s', claim_id, str(e))
+        # Enforce admin approval for valuable items before QR generation
+        if is_valuable:
+            # Require explicit admin approval recorded on the claim
+            approved_by = cdata.get('approved_by')
+            status_val = cdata.get('status')
+            if not approved_by and status_val != 'approved':
+                return False, {
+                    'error': 'Admin approval required before generating QR for valuable item',
+                    'code': 'ADMIN_APPROVAL_REQUIRED'
+                }, 403
 
         # Create cryptographically secure token and expiration
-        # Use alphanumeric-only token (8-32 chars) per spec; choose 24 for strong entropy
-        import string
-        alphabet = string.ascii_letters + string.digits
-        token = ''.join(secrets.choice(alphabet) for _ in range(24))
+        # Use alphanumeric-only token (8-32 chars) per spec; 24 hex chars carry 96 bits of entropy
+        token = secrets.token_hex(12)
         # Use timezone-aware UTC timestamp to avoid client parsing ambiguity
         expires_at_dt = datetime.now(timezone.utc) + timedelta(minutes=5)
         # Payload encodes required fields only (JSON, no URL prefixes)
-        student_id = claim_doc.to_dict().get('student_id')
         payload = {
             'claim_id': claim_id,
             'student_id': student_id,
             'token': token,
         }
-        import json
         # Convert JSON to bytes then encrypt with Fernet; envelope is a JSON string
         payload_json = json.dumps(payload)
         payload_bytes = payload_json.encode('utf-8')
@@ -1035,8 +1485,6 @@ def generate_claim_qr(claim_id: str, upload_folder: str):
         # Preflight encryption configuration: if misconfigured, gracefully fall back to plaintext QR
         qr_encrypted = True
         try:
-            # Import here to avoid circulars
-            from .crypto_service import get_active_fernet
             _ver, _f = get_active_fernet()  # Will raise CryptoConfigError if misconfigured
         except CryptoConfigError as e:
             _logger.warning('Encryption not configured for QR generation (claim=%s): %s. Falling back to plaintext JSON.', claim_id, str(e))
@@ -1063,19 +1511,15 @@ def generate_claim_qr(claim_id: str, upload_folder: str):
             envelope_str = payload_json
 
         # Generate QR using encrypted envelope string
-        ok, temp_or_err = _generate_qr_image(envelope_str, upload_folder, embed_logo=True)
+        ok, png_or_err = _generate_qr_image(envelope_str, embed_logo=True)
         if not ok:
             return False, {
-                'error': temp_or_err,
+                'error': png_or_err,
                 'code': 'QR_IMAGE_GENERATION_FAILED'
             }, 500
 
-        # Upload to storage
-        ok2, url_or_err = upload_image_to_storage(temp_or_err, folder_name='claims/qrs')
-        try:
-            os.remove(temp_or_err)
-        except Exception:
-            pass
+        # Upload the in-memory PNG to storage
+        ok2, url_or_err = upload_bytes_to_storage(png_or_err, folder_name='claims/qrs', file_extension='png')
         if not ok2:
             return False, {
                 'error': url_or_err,
@@ -1090,45 +1534,72 @@ def generate_claim_qr(claim_id: str, upload_folder: str):
         }
 
         # If the found item is non-valuable, auto-set approval fields
+        # (skipped when the value is unknown, as a fail-safe)
+        if is_valuable is False:
+            update_data['approved_by'] = 'system generate no approved required'
+            update_data['approved_at'] = firestore.SERVER_TIMESTAMP
+
+        # Enforce one active QR per user-item pair. The check and the claim update run in one
+        # transaction so two concurrent requests cannot both register; the loser gets a 409.
+        # The query needs the (found_item_id, student_id, expires_at DESC) composite index.
+        @gc_firestore.transactional
+        def _register_qr(transaction):
+            if found_item_id and student_id:
+                now_utc = datetime.now(timezone.utc)
+                # Only unexpired QRs match; expires_at is written together with qr_token
+                query = (_CLAIMS
+                         .where('found_item_id', '==', found_item_id)
+                         .where('student_id', '==', student_id)
+                         .where('expires_at', '>', now_utc)
+                         .order_by('expires_at', direction=firestore.Query.DESCENDING)
+                         .limit(2))
+                for d in transaction.get(query):
+                    if d.id != claim_id:
+                        return False
+            transaction.update(claim_ref, update_data)
+            return True
+
+        # Never register the QR when the uniqueness check could not run
         try:
-            found_item_id = claim_doc.to_dict().get('found_item_id')
-            if found_item_id:
-                item_doc = db.collection('found_items').document(found_item_id).get()
-                if item_doc.exists:
-                    item_data = item_doc.to_dict()
-                    is_valuable = item_data.get('is_valuable', False)
-                    if not is_valuable:
-                        update_data['approved_by'] = 'system generate no approved required'
-                        update_data['approved_at'] = firestore.SERVER_TIMESTAMP
-        except Exception:
-            # If any error occurs during item check, skip auto-approve (fail-safe)
-            pass
-
-        claim_ref.update(update_data)
+            registered = _register_qr(db.transaction())
+        except Exception as e:
+            _logger.error('QR uniqueness check failed for claim %s: %s', claim_id, str(e))
+            delete_image_from_storage(url_or_err)
+            return False, {
+                'error': 'Unable to verify QR uniqueness right now; please retry shortly',
+                'code': 'QR_UNIQUENESS_CHECK_FAILED'
+            }, 503
+        if not registered:
+            # The uploaded QR image is not referenced by any claim; remove it
+            delete_image_from_storage(url_or_err)
+            return False, {
+                'error': 'Another active QR is already registered for this item for your account',
+                'code': 'QR_ALREADY_REGISTERED_FOR_USER'
+            }, 409
+        clear_claim_cache(claim_id)
+        if found_item_id:
+            _invalidate_qr_status(found_item_id)
 
         try:
-            _create_notification(
-                user_id=student_id,
-                title='QR code registered',
-                message='Your QR code has been successfully registered',
-                link='/user/my-qr-code',
-                ntype='registration_success'
+            item_name = None
+            if found_item_id:
+                item_name = (_get_found_item_cached(found_item_id, item_cache, fields=_QR_ITEM_FIELDS) or {}).get('found_item_name')
+            subj = 'Your QR code is ready'
+            txt = f"Your QR code for {item_name or 'your item'} has been generated. It expires in 5 minutes."
+            html = f"<p>Your QR code for <strong>{item_name or 'your item'}</strong> has been generated.</p><p>It expires in 5 minutes for security.</p>"
+            _dispatch_side_effects(
+                dict(
+                    user_id=student_id,
+                    title='QR code registered',
+                    message='Your QR code has been successfully registered',
+                    link='/user/my-qr-code',
+                    ntype='registration_success'
+                ),
+                (student_id, subj, html, txt),
             )
-            try:
-                item_name = None
-                fi = cdata.get('found_item_id')
-                if fi:
-                    idoc = db.collection('found_items').document(fi).get()
-                    if idoc.exists:
-                        item_name = (idoc.to_dict() or {}).get('found_item_name')
-                subj = 'Your QR code is ready'
-                txt = f"Your QR code for {item_name or 'your item'} has been generated. It expires in 5 minutes."
-                html = f"<p>Your QR code for <strong>{item_name or 'your item'}</strong> has been generated.</p><p>It expires in 5 minutes for security.</p>"
-                _queue_trigger_email(student_id, subj, html, txt)
-            except Exception:
-                pass
         except Exception:
             pass
+        _flush_notifications_in_background()
 
         return True, {
             'success': True,
@@ -1147,6 +1618,7 @@ def generate_claim_qr(claim_id: str, upload_folder: str):
 def get_qr_status_for_item(found_item_id: str):
     """
     Check if there is an active (non-expired) QR registered for the given found item.
+    Successful results are cached per item for _QR_STATUS_TTL_SECONDS.
     Returns: (success, response, status_code)
       response: {
         'registered': bool,
@@ -1155,26 +1627,40 @@ def get_qr_status_for_item(found_item_id: str):
         'expires_at': str | None
       }
     """
+    now = time.monotonic()
+    with _QR_STATUS_CACHE_LOCK:
+        cached = _QR_STATUS_CACHE.get(found_item_id)
+        if cached:
+            if now - cached['ts'] < _QR_STATUS_TTL_SECONDS:
+                _QR_STATUS_CACHE.move_to_end(found_item_id)
+                return True, dict(cached['resp']), 200
+            del _QR_STATUS_CACHE[found_item_id]
+    ok, resp, status = _query_qr_status_for_item(found_item_id)
+    if ok:
+        with _QR_STATUS_CACHE_LOCK:
+            _QR_STATUS_CACHE[found_item_id] = {'resp': dict(resp), 'ts': now}
+            _QR_STATUS_CACHE.move_to_end(found_item_id)
+            while len(_QR_STATUS_CACHE) > _QR_STATUS_CACHE_MAXSIZE:
+                _QR_STATUS_CACHE.popitem(last=False)
+    return ok, resp, status
+
+def _query_qr_status_for_item(found_item_id: str):
+    """Uncached Firestore lookup behind get_qr_status_for_item."""
     try:
         now_utc = datetime.now(timezone.utc)
-        query = db.collection('claims').where('found_item_id', '==', found_item_id).where('qr_token', '!=', None)
-        docs = list(query.stream())
-        _logger.info('QR status query: item=%s, claims_with_qr=%d', found_item_id, len(docs))
+        # Indexed range query on (found_item_id, expires_at): only unexpired QRs are returned
+        query = (_CLAIMS
+                 .where('found_item_id', '==', found_item_id)
+                 .where('expires_at', '>', now_utc)
+                 .order_by('expires_at', direction=firestore.Query.DESCENDING)
+                 .limit(1))
         active_claim_id = None
         active_exp = None
-        for d in docs:
+        for d in query.stream():
             data = d.to_dict() or {}
-            exp = data.get('expires_at')
-            exp_dt = None
-            if exp:
-                try:
-                    exp_dt = exp if isinstance(exp, datetime) else datetime.fromtimestamp(float(exp), tz=timezone.utc)
-                except Exception:
-                    exp_dt = None
-            if exp_dt and now_utc < exp_dt:
-                active_claim_id = data.get('claim_id', d.id)
-                active_exp = exp_dt
-                break
+            active_claim_id = data.get('claim_id', d.id)
+            active_exp = data.get('expires_at')
+            break
         if active_claim_id:
             _logger.info('QR active found for item=%s, claim_id=%s, expires_at=%s', found_item_id, active_claim_id, active_exp)
             return True, {
@@ -1184,12 +1670,14 @@ def get_qr_status_for_item(found_item_id: str):
                 'expires_at': active_exp.isoformat(timespec='milliseconds').replace('+00:00', 'Z')
             }, 200
         # No active QR; if any QR exists but expired, still registered but inactive
+        docs = list(_CLAIMS.where('found_item_id', '==', found_item_id).where('qr_token', '!=', None).limit(1).stream())
         if docs:
-            _logger.info('QR found but inactive/expired for item=%s, claim_id=%s', found_item_id, (docs[0].to_dict() or {}).get('claim_id', docs[0].id))
+            inactive_claim_id = (docs[0].to_dict() or {}).get('claim_id', docs[0].id)
+            _logger.info('QR found but inactive/expired for item=%s, claim_id=%s', found_item_id, inactive_claim_id)
             return True, {
                 'registered': True,
                 'active': False,
-                'claim_id': (docs[0].to_dict() or {}).get('claim_id', docs[0].id),
+                'claim_id': inactive_claim_id,
                 'expires_at': None
             }, 200
         _logger.info('No QR registered for item=%s', found_item_id)
@@ -1221,47 +1709,43 @@ def get_qr_status_for_user_item(student_id: str, found_item_id: str):
     """
     try:
         now_utc = datetime.now(timezone.utc)
-        query = db.collection('claims').where('found_item_id', '==', found_item_id).where('student_id', '==', student_id).where('qr_token', '!=', None)
-        docs = list(query.stream())
+        # Indexed range query on (found_item_id, student_id, expires_at): only unexpired QRs are returned
+        query = (_CLAIMS
+                 .where('found_item_id', '==', found_item_id)
+                 .where('student_id', '==', student_id)
+                 .where('expires_at', '>', now_utc)
+                 .order_by('expires_at', direction=firestore.Query.DESCENDING)
+                 .limit(5))
         
         active_claim_id = None
         active_exp = None
         claim_status = None
         claim_valid = False
+        latest_doc = None
         
-        for d in docs:
+        for d in query.stream():
+            if latest_doc is None:
+                latest_doc = d
             data = d.to_dict() or {}
-            exp = data.get('expires_at')
-            exp_dt = None
+            # QR is active, now validate the linked claim
+            claim_status = data.get('status') or ''
             
-            # Parse expiration date
-            if exp:
-                try:
-                    exp_dt = exp if isinstance(exp, datetime) else datetime.fromtimestamp(float(exp), tz=timezone.utc)
-                except Exception:
-                    exp_dt = None
+            # Determine if the claim is still valid/uncompleted
+            # Valid claim statuses for active QR: pending, pending_approval, approved
+            valid_claim_statuses = ['pending', 'pending_approval', 'approved']
+            claim_valid = claim_status in valid_claim_statuses
             
-            # Check if QR is still active (not expired)
-            if exp_dt and now_utc < exp_dt:
-                # QR is active, now validate the linked claim
-                claim_status = data.get('status', '').lower()
-                
-                # Determine if the claim is still valid/uncompleted
-                # Valid claim statuses for active QR: pending, pending_approval, approved
-                valid_claim_statuses = ['pending', 'pending_approval', 'approved']
-                claim_valid = claim_status in valid_claim_statuses
-                
-                # Additional validation: ensure claim hasn't been completed/rejected
-                if claim_status == 'completed' or claim_status == 'rejected' or claim_status == 'cancelled':
-                    claim_valid = False
-                    _logger.info('QR found but claim is completed/rejected/cancelled for user=%s item=%s claim_status=%s', 
-                               student_id, found_item_id, claim_status)
-                    continue  # Skip this QR as it's linked to an invalid claim
-                
-                # If we reach here, both QR is active and claim is valid
-                active_claim_id = data.get('claim_id', d.id)
-                active_exp = exp_dt
-                break
+            # Additional validation: ensure claim hasn't been completed/rejected
+            if claim_status == 'completed' or claim_status == 'rejected' or claim_status == 'cancelled':
+                claim_valid = False
+                _logger.info('QR found but claim is completed/rejected/cancelled for user=%s item=%s claim_status=%s', 
+                           student_id, found_item_id, claim_status)
+                continue  # Skip this QR as it's linked to an invalid claim
+            
+            # If we reach here, both QR is active and claim is valid
+            active_claim_id = data.get('claim_id', d.id)
+            active_exp = data.get('expires_at')
+            break
         
         if active_claim_id and claim_valid:
             _logger.info('Valid active QR found for user=%s item=%s claim_id=%s status=%s expires_at=%s', 
@@ -1276,9 +1760,11 @@ def get_qr_status_for_user_item(student_id: str, found_item_id: str):
                 'has_active_qr': True  # For backward compatibility
             }, 200
         
-        if docs:
+        if latest_doc is None:
+            # No unexpired QR; an expired one still counts as registered but inactive
+            latest_doc = next(iter(_CLAIMS.where('found_item_id', '==', found_item_id).where('student_id', '==', student_id).where('qr_token', '!=', None).limit(1).stream()), None)
+        if latest_doc is not None:
             # QR exists but either expired or linked to invalid claim
-            latest_doc = docs[0]
             latest_data = latest_doc.to_dict() or {}
             _logger.info('QR found but inactive/invalid for user=%s item=%s claim_id=%s', 
                         student_id, found_item_id, latest_data.get('claim_id', latest_doc.id))
@@ -1313,32 +1799,33 @@ def get_active_qr_for_user(student_id: str):
         if not student_id:
             return False, {'error': 'Missing student_id'}, 400
         now_utc = datetime.now(timezone.utc)
-        query = db.collection('claims').where('student_id', '==', student_id).where('qr_token', '!=', None).order_by('created_at', direction=firestore.Query.DESCENDING)
-        try:
-            docs = list(query.limit(20).stream())
-        except Exception:
-            docs = list(db.collection('claims').where('student_id','==',student_id).where('qr_token','!=',None).stream())
+        qr_fields = ['qr_token', 'expires_at', 'qr_image_url', 'created_at', 'found_item_id']
+        # Indexed range query on (student_id, expires_at): the first result is the active QR, if any
+        query = (_CLAIMS.where('student_id', '==', student_id)
+                 .where('expires_at', '>', now_utc)
+                 .order_by('expires_at', direction=firestore.Query.DESCENDING)
+                 .limit(1)
+                 .select(qr_fields))
         active = None
-        for d in docs:
+        for d in query.stream():
             data = d.to_dict() or {}
-            exp = data.get('expires_at')
-            exp_dt = None
-            if exp:
-                try:
-                    exp_dt = exp if isinstance(exp, datetime) else datetime.fromtimestamp(float(exp), tz=timezone.utc)
-                except Exception:
-                    exp_dt = None
-            if exp_dt and now_utc < exp_dt:
-                active = (d.id, data)
-                break
+            # expires_at is written together with qr_token; the null check is cheaper here than in the query
+            if not data.get('qr_token'):
+                continue
+            active = (d.id, data)
         if not active:
             return True, {'success': True, 'qr_code': None}, 200
         claim_id, cdata = active
-        item_name = None
-        if cdata.get('found_item_id'):
-            idoc = db.collection('found_items').document(cdata.get('found_item_id')).get()
-            if idoc.exists:
-                item_name = (idoc.to_dict() or {}).get('found_item_name')
+        item_name = (_get_found_item(cdata.get('found_item_id')) or {}).get('found_item_name')
+        # The range query guarantees a Firestore datetime here; a missing value keeps the
+        # previous behaviour of reporting "now"
+        exp = cdata.get('expires_at')
+        if isinstance(exp, datetime):
+            expires_at_ms = int(exp.timestamp() * 1000)
+        elif exp is None:
+            expires_at_ms = int(now_utc.timestamp() * 1000)
+        else:
+            expires_at_ms = None
         resp = {
             'success': True,
             'qr_code': {
@@ -1346,8 +1833,8 @@ def get_active_qr_for_user(student_id: str):
                 'item_name': item_name,
                 'qr_image_url': cdata.get('qr_image_url'),
                 'created_at': _isoformat_or_none(cdata.get('created_at')),
-                'expires_at': _isoformat_or_none(cdata.get('expires_at')),
-                'expires_at_ms': int((cdata.get('expires_at') or now_utc).timestamp() * 1000) if hasattr((cdata.get('expires_at') or now_utc), 'timestamp') else None,
+                'expires_at': _isoformat_or_none(exp),
+                'expires_at_ms': expires_at_ms,
                 'token': cdata.get('qr_token')
             }
         }
@@ -1369,35 +1856,28 @@ def get_user_claim_status_for_item(student_id: str, found_item_id: str):
     """
     try:
         # Avoid composite index requirements: fetch and sort in Python
-        query = db.collection('claims').where('found_item_id', '==', found_item_id).where('student_id', '==', student_id)
-        docs = list(query.stream())
-        if not docs:
+        query = (_CLAIMS.where('found_item_id', '==', found_item_id).where('student_id', '==', student_id)
+                 .select(['claim_id', 'status', 'created_at', 'approved_by', 'approved_at']))
+        # Deserialize each snapshot once and reuse the dict below
+        rows = [(d.id, d.to_dict() or {}) for d in query.stream()]
+        if not rows:
             return True, {'exists': False, 'status': None, 'claim_id': None, 'approved_by': None, 'approved_at': None}, 200
 
-        def _created_at_or_min(doc):
-            data = doc.to_dict() or {}
-            dt = data.get('created_at')
-            # Firestore returns datetime; if missing, sort lowest
-            from datetime import datetime
-            try:
-                return dt if isinstance(dt, datetime) else datetime.min
-            except Exception:
-                return datetime.min
+        def _created_at_or_min(row):
+            dt = row[1].get('created_at')
+            # Firestore returns aware datetimes; if missing, sort lowest (aware, so it compares)
+            return dt if isinstance(dt, datetime) else datetime.min.replace(tzinfo=timezone.utc)
 
         # Prefer pending-like statuses, otherwise pick latest by created_at
         pending_statuses = {'pending', 'pending_approval'}
-        pending_docs = [d for d in docs if str((d.to_dict() or {}).get('status', '')).lower() in pending_statuses]
-        if pending_docs:
-            d = sorted(pending_docs, key=_created_at_or_min, reverse=True)[0]
-        else:
-            d = sorted(docs, key=_created_at_or_min, reverse=True)[0]
+        pending_rows = [r for r in rows if r[1].get('status') in pending_statuses]
+        doc_id, data = max(pending_rows or rows, key=_created_at_or_min)
 
-        data = d.to_dict() or {}
         status = data.get('status')
         return True, {
             'exists': True,
             'status': status,
-            'claim_id': data.get('claim_id', d.id),
+            'claim_id': data.get('claim_id', doc_id),
             'approved_by': data.get('approved_by'),
             'approved_at': data.get('approved_at'),
         }, 200
@@ -1427,47 +1907,48 @@ def check_user_global_claim_status(student_id: str, exclude_item_id: str = None)
         # Define statuses that are considered "active" and should block new claims
         active_statuses = ['pending', 'pending_approval', 'approved']
         
-        # Query for all claims by this user with active statuses
-        query = db.collection('claims').where('student_id', '==', student_id)
-        all_claims = list(query.stream())
+        # Query only this user's claims in an active status (index: student_id, status)
+        query = (_CLAIMS.where('student_id', '==', student_id).where('status', 'in', active_statuses)
+                 .select(['claim_id', 'found_item_id', 'status', 'created_at', 'item_name']))
         
         active_claims = []
         blocking_claim = None
         
-        for claim_doc in all_claims:
-            claim_data = claim_doc.to_dict() or {}
-            claim_status = claim_data.get('status', '').lower()
+        # Deserialize each projected snapshot once and reuse the dict below
+        rows = [(claim_doc.id, claim_doc.to_dict() or {}) for claim_doc in query.stream()]
+        
+        for claim_id, claim_data in rows:
             claim_item_id = claim_data.get('found_item_id')
             
             # Skip if this is the item we're excluding (current item being validated)
             if exclude_item_id and claim_item_id == exclude_item_id:
                 continue
             
-            # Check if this claim is in an active status
-            if claim_status in active_statuses:
-                claim_details = {
-                    'claim_id': claim_data.get('claim_id', claim_doc.id),
-                    'found_item_id': claim_item_id,
-                    'status': claim_status,
-                    'created_at': claim_data.get('created_at'),
-                    'item_name': None  # Will be populated if needed
-                }
-                
-                # Try to get item name for better user experience
-                try:
-                    if claim_item_id:
-                        item_doc = db.collection('found_items').document(claim_item_id).get()
-                        if item_doc.exists:
-                            item_data = item_doc.to_dict() or {}
-                            claim_details['item_name'] = item_data.get('found_item_name', 'Unknown Item')
-                except Exception:
-                    pass  # Continue without item name if fetch fails
-                
-                active_claims.append(claim_details)
-                
-                # Set the first active claim as the blocking claim
-                if not blocking_claim:
-                    blocking_claim = claim_details
+            claim_details = {
+                'claim_id': claim_data.get('claim_id', claim_id),
+                'found_item_id': claim_item_id,
+                'status': claim_data.get('status') or '',
+                'created_at': claim_data.get('created_at'),
+                # Stored on the claim since start_claim denormalized it; legacy claims are filled below
+                'item_name': claim_data.get('item_name')
+            }
+            
+            active_claims.append(claim_details)
+            
+            # Set the first active claim as the blocking claim
+            if not blocking_claim:
+                blocking_claim = claim_details
+        
+        # Try to get item names for better user experience
+        try:
+            legacy_claims = [c for c in active_claims if not c['item_name']]
+            items_by_id = _get_found_items_cached(c['found_item_id'] for c in legacy_claims)
+            for claim_details in legacy_claims:
+                item_data = items_by_id.get(claim_details['found_item_id'])
+                if item_data is not None:
+                    claim_details['item_name'] = item_data.get('found_item_name', 'Unknown Item')
+        except Exception:
+            pass  # Continue without item names if fetch fails
         
         has_active_claims = len(active_claims) > 0
         
@@ -1514,7 +1995,7 @@ def validate_admin_status_for_approval(admin_id: str):
             }, 200
         
         # Get admin user document
-        admin_doc = db.collection('users').document(admin_id).get()
+        admin_doc = _USERS.document(admin_id).get()
         
         if not admin_doc.exists:
             _logger.warning('Admin validation failed: admin document not found for ID %s', admin_id)
@@ -1564,10 +2045,18 @@ def validate_admin_status_for_approval(admin_id: str):
         return False, {'error': str(e)}, 500
 
 
+# QR payload field formats, compiled once for the kiosk verification path
+_RE_CLAIM_ID = re.compile(r'C\d{4}')
+_RE_STUDENT_ID = re.compile(r'\d{7}')
+_RE_TOKEN = re.compile(r'[A-Za-z0-9]{8,32}')
+_RE_INDEX_URL = re.compile(r'https://console\.firebase\.google\.com[^\s]+')
+# encrypt_bytes_with_envelope writes compact JSON, so envelopes always start with this
+_ENVELOPE_JSON_PREFIX = '{"v"'
+
 def verify_claim_qr_data(qr_raw: str):
     """
     Verify scanned QR data.
-    - Parse raw QR string as JSON using json.loads()
+    - Parse raw QR string as JSON (orjson when installed, stdlib json otherwise)
     - Validate presence of required fields: claim_id, student_id, token
     - Match claim_id + token + student_id against Firestore claim document
     - Ensure claim status is 'pending' and not expired
@@ -1575,8 +2064,6 @@ def verify_claim_qr_data(qr_raw: str):
     Returns: (success: bool, response: dict, status_code: int)
     """
     try:
-        import json
-        import re
         # Normalize raw input: support encrypted envelope (preferred) and legacy plaintext JSON
         if isinstance(qr_raw, dict):
             # Assume already decrypted JSON dict
@@ -1585,30 +2072,43 @@ def verify_claim_qr_data(qr_raw: str):
             # Attempt to decrypt if bytes provided
             try:
                 decrypted = decrypt_envelope_to_bytes(qr_raw.decode('utf-8'))
-                data = json.loads(decrypted.decode('utf-8'))
+                data = _json_loads(decrypted)
             except InvalidToken:
                 return False, {'error': 'Invalid encryption or tampered data'}, 400
         elif isinstance(qr_raw, str):
+            data = None
+            stripped = qr_raw.lstrip()
+            if stripped.startswith('{') and not stripped.startswith(_ENVELOPE_JSON_PREFIX):
+                # Legacy plaintext JSON: parse directly instead of failing a decrypt first
+                try:
+                    data = _json_loads(stripped)
+                except ValueError:
+                    data = None
+                if isinstance(data, dict) and 'v' in data and 'd' in data:
+                    # Hand-formatted envelope; let the decrypt path below handle it
+                    data = None
+        else:
+            return False, {'error': 'Unsupported QR data type'}, 400
+
+        if data is None and isinstance(qr_raw, str):
             # Try decrypting envelope first
             try:
                 decrypted = decrypt_envelope_to_bytes(qr_raw)
-                data = json.loads(decrypted.decode('utf-8'))
+                data = _json_loads(decrypted)
             except InvalidToken:
                 # Fallback: try legacy/plaintext JSON
                 try:
-                    data = json.loads(qr_raw)
+                    data = _json_loads(qr_raw)
                 except Exception:
                     return False, {'error': 'Invalid QR data: cannot decrypt or parse JSON'}, 400
             except CryptoConfigError:
                 # If encryption is not configured, treat payload as plaintext JSON
                 try:
-                    data = json.loads(qr_raw)
+                    data = _json_loads(qr_raw)
                 except Exception as e:
                     return False, {'error': f'Encryption configuration error and plaintext parse failed: {str(e)}'}, 500
             except Exception as e:
                 return False, {'error': f'Decryption failed: {str(e)}'}, 500
-        else:
-            return False, {'error': 'Unsupported QR data type'}, 400
 
         if not isinstance(data, dict):
             return False, {'error': 'QR payload must be a JSON object'}, 400
@@ -1625,19 +2125,29 @@ def verify_claim_qr_data(qr_raw: str):
         token = data['token'].strip()
 
         # Schema validation per spec
-        if not re.fullmatch(r'C\d{4}', claim_id):
+        if not _RE_CLAIM_ID.fullmatch(claim_id):
             return False, {'error': 'Invalid claim_id format'}, 400
-        if not re.fullmatch(r'\d{7}', student_id):
+        if not _RE_STUDENT_ID.fullmatch(student_id):
             return False, {'error': 'Invalid student_id format'}, 400
-        if not re.fullmatch(r'[A-Za-z0-9]{8,32}', token):
+        if not _RE_TOKEN.fullmatch(token):
             return False, {'error': 'Invalid token format'}, 400
 
-        # Fetch claim doc
-        claim_ref = db.collection('claims').document(claim_id)
-        ok_doc, cdata_or_err, status_code = _get_claim_data_cached(claim_id)
-        if not ok_doc:
-            return False, cdata_or_err, status_code
-        cdata = cdata_or_err
+        # Fetch the claim and the student's account in one batched read. The projection
+        # covers both documents: the user check only needs 'status'.
+        claim_ref = _CLAIMS.document(claim_id)
+        user_ref = _USERS.document(student_id)
+        snaps = {
+            snap.reference.path: snap
+            for snap in db.get_all(
+                [claim_ref, user_ref],
+                field_paths=['student_id', 'qr_token', 'status', 'expires_at', 'found_item_id', 'verification_method']
+            )
+        }
+        claim_snap = snaps.get(claim_ref.path)
+        if claim_snap is None or not claim_snap.exists:
+            return False, {'error': 'Claim not found'}, 404
+        cdata = claim_snap.to_dict() or {}
+        user_doc = snaps.get(user_ref.path)
 
         # Field checks
         # Ensure the claim belongs to the same student
@@ -1649,26 +2159,23 @@ def verify_claim_qr_data(qr_raw: str):
         if not stored_token or not isinstance(stored_token, str) or not stored_token.strip():
             return False, {'error': 'QR token missing for this claim'}, 400
         if stored_token.strip() != token:
-            import os
             if os.environ.get('ALLOW_QR_TOKEN_FALLBACK', 'false').lower() in ('1','true','yes'):
                 _logger.warning('QR token mismatch for claim %s but ALLOW_QR_TOKEN_FALLBACK enabled; proceeding', claim_id)
             else:
                 return False, {'error': 'Invalid or mismatched token'}, 403
 
         # Enforce claim approval status per new validation requirements
-        status_val = str(cdata.get('status', '')).strip().lower()
+        status_val = cdata.get('status') or ''
         if status_val != 'approved':
             return False, {'error': 'Claim is not approved'}, 409
 
         # Verify the student account exists and is active
         try:
-            user_doc = db.collection('users').document(student_id).get()
-            if not user_doc.exists:
+            if user_doc is None or not user_doc.exists:
                 return False, {'error': 'Student account does not exist'}, 404
             user_data = user_doc.to_dict() or {}
             account_status = str((user_data.get('status') or '')).strip().lower()
             if account_status != 'active':
-                import os
                 if os.environ.get('ALLOW_QR_TOKEN_FALLBACK', 'false').lower() in ('1','true','yes'):
                     _logger.warning('User %s not active (status=%s) but ALLOW_QR_TOKEN_FALLBACK enabled; proceeding', student_id, user_data.get('status'))
                 else:
@@ -1710,15 +2217,14 @@ def verify_claim_qr_data(qr_raw: str):
         
         if found_item_id:
             try:
-                # Prefer direct doc lookup; fallback to business-id field
-                item_doc = db.collection('found_items').document(found_item_id).get()
-                if not item_doc.exists:
-                    q = db.collection('found_items').where('found_item_id', '==', found_item_id).limit(1)
+                # Prefer cached direct doc lookup; fallback to business-id field
+                item_data = _get_found_item(found_item_id)
+                if item_data is None:
+                    q = _FOUND_ITEMS.where('found_item_id', '==', found_item_id).limit(1)
                     results = list(q.stream())
-                    item_doc = results[0] if results else None
+                    item_data = (results[0].to_dict() or {}) if results else None
 
-                if item_doc and item_doc.exists:
-                    item_data = item_doc.to_dict() or {}
+                if item_data is not None:
                     face_embedding = item_data.get('face_embedding')
                     rfid_uid = item_data.get('rfid_uid')
             except Exception:
@@ -1748,21 +2254,28 @@ def verify_claim(user_id, item_id):
     """
     return True, {"message": "Claim verified successfully"}
 
+_UTC_ISO_SUFFIX_LEN = len('+00:00')
+
 def _isoformat_or_none(dt) -> str | None:
     """Helper: convert Firestore datetime/epoch to ISO string with Z suffix."""
-    try:
-        if not dt:
-            return None
-        # Firestore returns datetime objects; sometimes epoch seconds are stored
-        if isinstance(dt, datetime):
-            # Ensure timezone awareness
-            if dt.tzinfo is None:
-                dt = dt.replace(tzinfo=timezone.utc)
-            return dt.isoformat(timespec='milliseconds').replace('+00:00', 'Z')
-        # Fallback: epoch seconds
-        return datetime.fromtimestamp(float(dt), tz=timezone.utc).isoformat(timespec='milliseconds').replace('+00:00', 'Z')
-    except Exception:
+    if dt is None:
         return None
+    # Firestore returns datetime objects; sometimes epoch seconds are stored
+    if isinstance(dt, datetime):
+        # Normalise to UTC so the offset is always '+00:00' and can be sliced off
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=timezone.utc)
+        elif dt.utcoffset():
+            dt = dt.astimezone(timezone.utc)
+        return dt.isoformat(timespec='milliseconds')[:-_UTC_ISO_SUFFIX_LEN] + 'Z'
+    # Fallback: epoch seconds
+    if isinstance(dt, (int, float)) and not isinstance(dt, bool) and dt:
+        try:
+            ts = datetime.fromtimestamp(dt, tz=timezone.utc)
+        except (OverflowError, OSError, ValueError):
+            return None
+        return ts.isoformat(timespec='milliseconds')[:-_UTC_ISO_SUFFIX_LEN] + 'Z'
+    return None
 
 def list_user_claims(student_id: str, status: str = None, sort: str = 'newest', days_filter: int = None, start_date: str | None = None, end_date: str | None = None, page_size: int = 20, cursor_id: str | None = None):
     """
@@ -1773,6 +2286,9 @@ def list_user_claims(student_id: str, status: str = None, sort: str = 'newest',
         status: Optional status filter (e.g., 'pending', 'completed')
         sort: Sort order ('newest', 'oldest', 'asc', 'desc')
         days_filter: Optional number of days to filter claims (e.g., 7 for last 7 days)
+        page_size: Claims per page (max 50)
+        cursor_id: Keyset cursor; the `next_cursor_id` returned with the previous page.
+            Pages are only reachable through this cursor (Firestore offsets bill every skipped doc).
 
     Returns: (success: bool, response: dict, status_code: int)
       response: {
@@ -1790,7 +2306,8 @@ def list_user_claims(student_id: str, status: str = None, sort: str = 'newest',
             'item_image_url': str | None,
             'is_valuable': bool | None,
           }
-        ]
+        ],
+        'pagination': {'page_size': int, 'next_cursor_id': str | None, 'returned_count': int}
       }
     """
     try:
@@ -1800,9 +2317,13 @@ def list_user_claims(student_id: str, status: str = None, sort: str = 'newest',
         if page_size is None or not isinstance(page_size, int) or page_size <= 0:
             page_size = 20
         page_size = min(page_size, 50)
+        # Normalize the filter and sort arguments once
+        status_norm = str(status).strip().lower() if status else None
+        sort_norm = str(sort).strip().lower() if sort else 'newest'
         allowed_sorts = {'newest', 'oldest', 'asc', 'desc', 'latest'}
-        if sort and str(sort).strip().lower() not in allowed_sorts:
+        if sort_norm not in allowed_sorts:
             return False, {'error': 'Invalid sort value', 'allowed': sorted(list(allowed_sorts))}, 400
+        sort_descending = sort_norm in ('newest', 'desc', 'latest')
 
         if days_filter is not None:
             if not isinstance(days_filter, int) or days_filter <= 0:
@@ -1831,146 +2352,73 @@ def list_user_claims(student_id: str, status: str = None, sort: str = 'newest',
         if start_dt and end_dt and start_dt > end_dt:
             return False, {'error': 'start_date must be before end_date'}, 400
 
-        query = db.collection('claims').where('student_id', '==', student_id)
-        if status:
-            query = query.where('status', '==', str(status).strip().lower())
+        query = _CLAIMS.where('student_id', '==', student_id)
+        if status_norm:
+            query = query.where('status', '==', status_norm)
 
-        query = query.order_by('created_at', direction=firestore.Query.DESCENDING if (sort or 'newest').lower() in ('newest', 'desc', 'latest') else firestore.Query.ASCENDING)
+        query = query.order_by('created_at', direction=firestore.Query.DESCENDING if sort_descending else firestore.Query.ASCENDING)
 
         if start_dt:
             query = query.where('created_at', '>=', start_dt)
         if end_dt:
             query = query.where('created_at', '<=', end_dt)
 
-        try:
-            query = query.select(['claim_id', 'status', 'created_at', 'approved_by', 'locker_id', 'found_item_id', 'verified_at'])
-        except Exception:
-            pass
+        query = query.select(['claim_id', 'status', 'created_at', 'approved_by', 'locker_id', 'found_item_id', 'verified_at',
+                              'item_name', 'item_image_url', 'is_valuable'])
 
         if cursor_id:
-            try:
-                last_doc = db.collection('claims').document(cursor_id).get()
-                if last_doc.exists:
-                    query = query.start_after(last_doc)
-            except Exception:
-                pass
+            # The snapshot only needs the ordered field for start_after; an unknown cursor is an
+            # error rather than a silent restart from the first page
+            last_doc = _CLAIMS.document(cursor_id).get(field_paths=['student_id', 'created_at'])
+            if not last_doc.exists or (last_doc.to_dict() or {}).get('student_id') != student_id:
+                return False, {'error': 'Invalid cursor', 'code': 'INVALID_CURSOR'}, 400
+            query = query.start_after(last_doc)
 
         try:
             docs = list(query.limit(page_size + 1).stream())
         except Exception as e:
             msg = str(e)
             if 'requires an index' in msg or 'FAILED_PRECONDITION' in msg:
-                try:
-                    # Fallback: load by student_id only, then filter/sort/paginate in Python
-                    base_q = db.collection('claims').where('student_id', '==', student_id)
-                    base_docs = list(base_q.stream())
-                    # Convert to list of dicts with created_at
-                    items = []
-                    for d in base_docs:
-                        data = d.to_dict() or {}
-                        data['__id'] = d.id
-                        items.append(data)
-                    # Filter by status
-                    if status:
-                        items = [x for x in items if str(x.get('status','')).strip().lower() == str(status).strip().lower()]
-                    # Filter by date range
-                    def _to_dt(v):
-                        try:
-                            return v if isinstance(v, datetime) else datetime.fromisoformat(str(v).replace('Z','+00:00'))
-                        except Exception:
-                            return None
-                    if start_dt:
-                        items = [x for x in items if (_to_dt(x.get('created_at')) or datetime.min.replace(tzinfo=timezone.utc)) >= start_dt]
-                    if end_dt:
-                        items = [x for x in items if (_to_dt(x.get('created_at')) or datetime.max.replace(tzinfo=timezone.utc)) <= end_dt]
-                    # Sort by created_at
-                    reverse = ((sort or 'newest').lower() in ('newest','desc','latest'))
-                    items.sort(key=lambda x: (_to_dt(x.get('created_at')) or datetime.min.replace(tzinfo=timezone.utc)), reverse=reverse)
-                    # Pagination fallback (no cursor id available reliably): simple first page only
-                    items = items[:page_size]
-                    claims = []
-                    for data in items:
-                        raw_status = str(data.get('status', 'pending')).strip().lower()
-                        status_title = raw_status.capitalize()
-                        claim_id = data.get('claim_id') or data.get('__id')
-                        found_item_id = data.get('found_item_id')
-                        item_name = None
-                        item_image_url = None
-                        is_valuable = None
-                        try:
-                            if found_item_id:
-                                item_doc = db.collection('found_items').document(found_item_id).get()
-                                if item_doc and item_doc.exists:
-                                    item_data = item_doc.to_dict() or {}
-                                    item_name = item_data.get('found_item_name') or item_data.get('name')
-                                    item_image_url = item_data.get('image_url') or (item_data.get('images', []) or [None])[0]
-                                    is_valuable = bool(item_data.get('is_valuable') or item_data.get('valuable') or False)
-                        except Exception:
-                            pass
-                        claims.append({
-                            'id': claim_id,
-                            'status': status_title,
-                            'created_at': _isoformat_or_none(data.get('created_at')),
-                            'approved_by': data.get('approved_by'),
-                            'verification_timestamp': _isoformat_or_none(data.get('verified_at')),
-                            'locker_id': data.get('locker_id'),
-                            'found_item_id': found_item_id,
-                            'item_name': item_name,
-                            'item_image_url': item_image_url,
-                            'is_valuable': is_valuable,
-                        })
-                    return True, {'success': True, 'claims': claims, 'pagination': {'page_size': page_size, 'next_cursor_id': None, 'returned_count': len(claims)}}, 200
-                except Exception as e2:
-                    import re
-                    m = re.search(r'https://console\.firebase\.google\.com[^\s]+', msg)
-                    return False, {
-                        'error': 'Query requires a Firestore composite index',
-                        'code': 'INDEX_REQUIRED',
-                        'index_url': m.group(0) if m else None,
-                        'details': str(e2)
-                    }, 400
+                # The indexes ship in config/firebase/firestore.indexes.json; a missing one is a deploy error
+                m = _RE_INDEX_URL.search(msg)
+                index_url = m.group(0) if m else None
+                _logger.error('list_user_claims query for user=%s is missing a Firestore composite index: %s', student_id, index_url or msg)
+                return False, {
+                    'error': 'Query requires a Firestore composite index',
+                    'code': 'INDEX_REQUIRED',
+                    'index_url': index_url,
+                }, 500
             return False, {'error': 'Failed to query Firestore', 'code': 'FIRESTORE_QUERY_ERROR', 'details': msg}, 500
 
+        # The extra document only signals another page; the cursor is the last one returned
         next_cursor_id = None
         if len(docs) > page_size:
+            docs = docs[:page_size]
             next_cursor_id = docs[-1].id
-            docs = docs[:-1]
 
-        claims = []
-        for d in docs:
-            data = d.to_dict() or {}
-            raw_status = str(data.get('status', 'pending')).strip().lower()
-            status_title = raw_status.capitalize()
-            claim_id = data.get('claim_id', d.id)
-            found_item_id = data.get('found_item_id')
-
-            item_name = None
-            item_image_url = None
-            is_valuable = None
-            try:
-                if found_item_id:
-                    item_ref = db.collection('found_items').document(found_item_id)
-                    try:
-                        item_query = item_ref
-                        item_doc = item_query.get()
-                    except Exception:
-                        item_doc = item_ref.get()
-                    if item_doc and item_doc.exists:
-                        item_data = item_doc.to_dict() or {}
-                        item_name = item_data.get('found_item_name') or item_data.get('name')
-                        item_image_url = item_data.get('image_url') or (item_data.get('images', []) or [None])[0]
-                        is_valuable = bool(item_data.get('is_valuable') or item_data.get('valuable') or False)
-            except Exception:
-                pass
+        rows = [(d, d.to_dict() or {}) for d in docs]
+        # Legacy claims without the denormalized item fields share one batched item read
+        try:
+            items_by_id = _get_found_items_cached(_legacy_item_ids(data for _, data in rows))
+        except Exception:
+            items_by_id = {}
 
-            claims.append({
-                'id': claim_id,
-                'status': status_title,
-                'created_at': _isoformat_or_none(data.get('created_at')),
-                'approved_by': data.get('approved_by'),
-                'verification_timestamp': _isoformat_or_none(data.get('verified_at')),
-                'locker_id': data.get('locker_id'),
-                'found_item_id': found_item_id,
+        # Local bindings keep the per-row lookups out of the module globals
+        iso = _isoformat_or_none
+        item_display = _claim_item_display
+        claims = []
+        append = claims.append
+        for d, data in rows:
+            g = data.get
+            item_name, item_image_url, is_valuable = item_display(data, items_by_id)
+            append({
+                'id': g('claim_id', d.id),
+                'status': (g('status') or 'pending').capitalize(),
+                'created_at': iso(g('created_at')),
+                'approved_by': g('approved_by'),
+                'verification_timestamp': iso(g('verified_at')),
+                'locker_id': g('locker_id'),
+                'found_item_id': g('found_item_id'),
                 'item_name': item_name,
                 'item_image_url': item_image_url,
                 'is_valuable': is_valuable,
@@ -1992,64 +2440,189 @@ def cancel_claim(claim_id: str, student_id: str):
         if not claim_id or not student_id:
             return False, {'error': 'Missing claim_id or student_id'}, 400
 
-        claim_ref = db.collection('claims').document(claim_id)
-        claim_doc = claim_ref.get()
-        if not claim_doc.exists:
-            return False, {'error': 'Claim not found'}, 404
+        claim_ref = _CLAIMS.document(claim_id)
 
-        data = claim_doc.to_dict() or {}
-        if data.get('student_id') != student_id:
-            return False, {'error': 'Forbidden: claim does not belong to user'}, 403
+        # Check and update inside one transaction so a concurrent approval cannot be overwritten
+        @gc_firestore.transactional
+        def _cancel(transaction):
+            snap = claim_ref.get(field_paths=['student_id', 'status'], transaction=transaction)
+            if not snap.exists:
+                return False, {'error': 'Claim not found'}, 404
 
-        status = str(data.get('status', '')).lower()
-        if status != 'pending':
-            return False, {'error': f'Cannot cancel claim in status "{data.get("status")}"'}, 409
+            data = snap.to_dict() or {}
+            if data.get('student_id') != student_id:
+                return False, {'error': 'Forbidden: claim does not belong to user'}, 403
 
-        now_utc = datetime.now(timezone.utc)
-        claim_ref.update({
-            'status': 'cancelled',
-            'cancelled_at': now_utc,
-            'cancelled_by': student_id,
-        })
+            if data.get('status') != 'pending':
+                return False, {'error': f'Cannot cancel claim in status "{data.get("status")}"'}, 409
+
+            transaction.update(claim_ref, {
+                'status': 'cancelled',
+                'cancelled_at': firestore.SERVER_TIMESTAMP,
+                'cancelled_by': student_id,
+            })
+            return True, None, 200
+
+        ok, err, status_code = _cancel(db.transaction())
+        if not ok:
+            return False, err, status_code
+        clear_claim_cache(claim_id)
 
         _logger.info('Claim %s cancelled by user %s', claim_id, student_id)
+        _flush_notifications_in_background()
         return True, {'success': True, 'message': 'Claim cancelled'}, 200
     except Exception as e:
         _logger.error('Error cancelling claim %s by user %s: %s', claim_id, student_id, str(e))
         return False, {'error': str(e)}, 500
+# Notifications are buffered and written with batched commits by flush_notifications()
+_NOTIF_BATCH_LIMIT = 500  # Firestore's per-commit write limit
+# Transient commit failures are retried briefly; sets on pre-allocated IDs are safe to repeat
+_NOTIF_RETRY = api_retry.Retry(
+    initial=0.1,
+    maximum=1.0,
+    multiplier=2.0,
+    deadline=3.0,
+    predicate=api_retry.if_exception_type(Aborted, DeadlineExceeded, ServiceUnavailable),
+)
+_notif_batch = []
+_NOTIF_BATCH_LOCK = threading.Lock()
+
+def flush_notifications() -> int:
+    """Commit buffered notifications in batches of up to 500 writes.
+    Returns the number of notifications written.
+    """
+    with _NOTIF_BATCH_LOCK:
+        pending = _notif_batch[:]
+        _notif_batch.clear()
+    written = 0
+    for start in range(0, len(pending), _NOTIF_BATCH_LIMIT):
+        chunk = pending[start:start + _NOTIF_BATCH_LIMIT]
+        batch = db.batch()
+        for ref, payload in chunk:
+            batch.set(ref, payload)
+        try:
+            batch.commit(retry=_NOTIF_RETRY)
+            written += len(chunk)
+        except Exception:
+            _logger.exception(
+                'Failed to write %d notifications (user_id=%s, ntype=%s)',
+                len(chunk),
+                ','.join(sorted({str(p.get('user_id')) for _, p in chunk})),
+                ','.join(sorted({str(p.get('type')) for _, p in chunk})),
+            )
+    return written
+
 def _create_notification(user_id: str, title: str, message: str, link: str, ntype: str):
     try:
-        ref = db.collection('notifications').document()
-        now = datetime.now(timezone.utc)
-        ref.set({
+        ref = _NOTIFICATIONS.document()
+        payload = {
             'notification_id': ref.id,
             'user_id': user_id,
             'title': title,
             'message': message,
             'link': link,
             'is_read': False,
-            'timestamp': now,
+            'timestamp': firestore.SERVER_TIMESTAMP,
             'type': ntype
-        })
+        }
+        with _NOTIF_BATCH_LOCK:
+            _notif_batch.append((ref, payload))
     except Exception:
-        pass
+        _logger.exception('Failed to queue notification (user_id=%s, ntype=%s)', user_id, ntype)
+
+# Outgoing email is handed to a small pool of background workers so SMTP never runs on the request thread
+_EMAIL_QUEUE = queue.Queue(maxsize=1000)
+_EMAIL_WORKER_COUNT = 2
+_EMAIL_MAX_ATTEMPTS = 4
+_EMAIL_RETRY_BASE_SECONDS = 2.0
+_EMAIL_WORKERS = []
+_EMAIL_WORKER_LOCK = threading.Lock()
+
+def _send_email_with_retry(email: str, subject: str, html: str, text: str | None) -> bool:
+    """Send one email, retrying failed SMTP sessions with exponential backoff (2s, 4s, 8s)."""
+    for attempt in range(1, _EMAIL_MAX_ATTEMPTS + 1):
+        try:
+            if send_email(email, subject, html=html, text=text):
+                return True
+        except Exception as e:
+            _logger.warning('Email send raised for %s: %s (%s)', email, subject, str(e))
+        cfg = get_smtp_config()
+        if not cfg['user'] or not cfg['password'] or attempt == _EMAIL_MAX_ATTEMPTS:
+            # Missing credentials will not fix themselves; don't hold a worker retrying
+            break
+        time.sleep(_EMAIL_RETRY_BASE_SECONDS * (2 ** (attempt - 1)))
+    return False
+
+def _email_worker():
+    while True:
+        email, subject, html, text = _EMAIL_QUEUE.get()
+        try:
+            if _send_email_with_retry(email, subject, html, text):
+                _logger.info('Email sent to %s: %s', email, subject)
+            else:
+                _logger.warning('Email send failed for %s: %s', email, subject)
+        except Exception as e:
+            _logger.warning('Email send failed for %s: %s (%s)', email, subject, str(e))
+        finally:
+            _EMAIL_QUEUE.task_done()
+
+def _ensure_email_worker():
+    """Start the email workers on first use (lazily, so forked server workers each get their own)."""
+    if len(_EMAIL_WORKERS) == _EMAIL_WORKER_COUNT and all(w.is_alive() for w in _EMAIL_WORKERS):
+        return
+    with _EMAIL_WORKER_LOCK:
+        _EMAIL_WORKERS[:] = [w for w in _EMAIL_WORKERS if w.is_alive()]
+        while len(_EMAIL_WORKERS) < _EMAIL_WORKER_COUNT:
+            worker = threading.Thread(
+                target=_email_worker,
+                name=f'claim-email-worker-{len(_EMAIL_WORKERS) + 1}',
+                daemon=True,
+            )
+            worker.start()
+            _EMAIL_WORKERS.append(worker)
+
+# Recipient addresses by student_id; one claim transition often sends several emails
+_USER_EMAIL_CACHE = OrderedDict()
+_USER_EMAIL_TTL_SECONDS = 300
+_USER_EMAIL_CACHE_MAXSIZE = 2048
+_USER_EMAIL_CACHE_LOCK = threading.RLock()
+
+def _get_user_email(student_id: str) -> str | None:
+    """Return the student's email, reading only that field and caching hits for _USER_EMAIL_TTL_SECONDS."""
+    now = time.monotonic()
+    with _USER_EMAIL_CACHE_LOCK:
+        cached = _USER_EMAIL_CACHE.get(student_id)
+        if cached:
+            if now - cached['ts'] < _USER_EMAIL_TTL_SECONDS:
+                _USER_EMAIL_CACHE.move_to_end(student_id)
+                return cached['email']
+            del _USER_EMAIL_CACHE[student_id]
+    ud = _USERS.document(student_id).get(field_paths=['email'])
+    if not ud.exists:
+        return None
+    email = (ud.to_dict() or {}).get('email')
+    if email:
+        with _USER_EMAIL_CACHE_LOCK:
+            _USER_EMAIL_CACHE[student_id] = {'email': email, 'ts': now}
+            _USER_EMAIL_CACHE.move_to_end(student_id)
+            while len(_USER_EMAIL_CACHE) > _USER_EMAIL_CACHE_MAXSIZE:
+                _USER_EMAIL_CACHE.popitem(last=False)
+    return email
 
 def _queue_trigger_email(student_id: str, subject: str, html: str, text: str = None):
+    """Look up the student's email and enqueue the message. Returns True once queued."""
     try:
         if not student_id or not subject or not html:
             return False
-        uref = db.collection('users').document(student_id)
-        ud = uref.get()
-        if not ud.exists:
-            return False
-        email = (ud.to_dict() or {}).get('email')
+        email = _get_user_email(student_id)
         if not email:
             return False
-        ok = send_email(email, subject, html=html, text=text)
-        if ok:
-            _logger.info('Email sent to %s: %s', email, subject)
-        else:
-            _logger.warning('Email send failed for %s: %s', email, subject)
-        return ok
+        _ensure_email_worker()
+        try:
+            _EMAIL_QUEUE.put_nowait((email, subject, html, text))
+        except queue.Full:
+            _logger.warning('Email queue full; dropping email to %s: %s', email, subject)
+            return False
+        return True
     except Exception:
         return False
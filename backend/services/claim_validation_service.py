@@ -268,21 +268,18 @@ class ClaimValidationService:
                 qr_token = claim_data.get('qr_token')
                 expires_at = claim_data.get('expires_at')
                 
-                if qr_token and expires_at:
-                    try:
-                        exp_dt = expires_at if isinstance(expires_at, datetime) else datetime.fromtimestamp(float(expires_at), tz=timezone.utc)
-                        if now_utc < exp_dt:
-                            raise ValidationError(
-                                "You have an active QR code for this item. Please use it or wait for expiration",
-                                "ACTIVE_QR_EXISTS",
-                                409
-                            )
-                    except Exception:
-                        pass  # Invalid expiration date, continue
+                # Firestore returns timestamp fields as datetime; anything else is not a valid expiry
+                if qr_token and isinstance(expires_at, datetime) and now_utc < expires_at:
+                    raise ValidationError(
+                        "You have an active QR code for this item. Please use it or wait for expiration",
+                        "ACTIVE_QR_EXISTS",
+                        409
+                    )
             
             # Check for concurrent claim attempts across all items
             all_user_claims = db.collection('claims').where('student_id', '==', user_id).where('status', '==', 'pending')
-            pending_claims_count = len(list(all_user_claims.stream()))
+            # Server-side aggregation: counts without transferring the claim documents
+            pending_claims_count = all_user_claims.count().get()[0][0].value
             
             if pending_claims_count >= MAX_CONCURRENT_CLAIMS_PER_USER:
                 raise ValidationError(
@@ -24,6 +24,7 @@ from __future__ import annotations
 
 import os
 import json
+import functools
 from typing import Dict, Tuple
 
 try:
@@ -41,6 +42,12 @@ def _load_key_map() -> Dict[str, str]:
     raw = os.environ.get('QRECLAIM_FERNET_KEYS', '').strip()
     if not raw:
         raise CryptoConfigError('Missing env var QRECLAIM_FERNET_KEYS')
+    return _parse_key_map(raw)
+
+
+@functools.lru_cache(maxsize=4)
+def _parse_key_map(raw: str) -> Dict[str, str]:
+    """Parse the key map JSON; cached on the raw env value so a rotated value is re-parsed."""
     try:
         key_map = json.loads(raw)
     except Exception as e:
@@ -54,12 +61,18 @@ def _get_active_version(key_map: Dict[str, str]) -> str:
     active = os.environ.get('QRECLAIM_FERNET_ACTIVE', '').strip()
     if not active:
         # Fallback to first key in mapping (deterministic order by sorted keys)
-        active = sorted(key_map.keys())[0]
+        active = min(key_map)
     if active not in key_map:
         raise CryptoConfigError(f'Active key version {active} not found in key map')
     return active
 
 
+@functools.lru_cache(maxsize=8)
+def _fernet_for_key(key: str) -> Fernet:
+    """Build the Fernet for a key once per process; keyed on the key itself, so rotation needs no invalidation."""
+    return Fernet(key)
+
+
 def get_fernet_for_version(version: str) -> Fernet:
     """Return Fernet instance for the given version from env config."""
     if Fernet is None:
@@ -69,7 +82,7 @@ def get_fernet_for_version(version: str) -> Fernet:
     if not key:
         raise CryptoConfigError(f'Key version {version} not configured')
     try:
-        return Fernet(key)
+        return _fernet_for_key(key)
     except Exception as e:
         raise CryptoConfigError(f'Invalid key for version {version}: {e}')
 
@@ -82,7 +95,7 @@ def get_active_fernet() -> Tuple[str, Fernet]:
     version = _get_active_version(key_map)
     key = key_map[version]
     try:
-        return version, Fernet(key)
+        return version, _fernet_for_key(key)
     except Exception as e:
         raise CryptoConfigError(f'Invalid active key {version}: {e}')
 
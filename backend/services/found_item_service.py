@@ -34,7 +34,8 @@ def get_dashboard_statistics():
             try:
                 agg = q.count()
                 res = agg.get()
-                return res[0].value
+                # get() returns one list of aggregation results per query
+                return res[0][0].value
             except Exception:
                 return len(list(q.select(['status']).stream()))
 
@@ -730,6 +731,8 @@ def update_found_item(found_item_id, data, image_file=None, upload_folder=None):
             
         # Get the current found item data
         current_data = doc.to_dict()
+        # Stored values before this update, for detecting which fields actually change
+        original_data = dict(current_data)
         
         # Process image if provided
         if image_file and upload_folder:
@@ -879,6 +882,11 @@ def update_found_item(found_item_id, data, image_file=None, upload_folder=None):
         
         # Update the found item
         doc_ref.update(update_data)
+        _invalidate_claim_item_cache(found_item_id)
+        # Claims carry copies of the item name/image/valuable flag; keep them in step
+        if any(k in update_data and update_data[k] != original_data.get(k)
+               for k in ('found_item_name', 'is_valuable', 'image_url')):
+            _refresh_claim_item_fields(found_item_id, {**original_data, **update_data})
         
         return True, {
             'success': True,
@@ -888,6 +896,23 @@ def update_found_item(found_item_id, data, image_file=None, upload_folder=None):
     except Exception as e:
         return False, {'error': str(e)}, 500
 
+def _invalidate_claim_item_cache(found_item_id):
+    """Drop the item from claim_service's found_items cache so claim reads see the change."""
+    try:
+        # Import here to avoid loading the claim service (and its face models) at import time
+        from .claim_service import invalidate_found_item_cache
+        invalidate_found_item_cache(found_item_id)
+    except Exception:
+        pass
+
+def _refresh_claim_item_fields(found_item_id, item_data):
+    """Push changed item display fields onto the claims that denormalize them."""
+    try:
+        from .claim_service import refresh_claim_item_fields
+        refresh_claim_item_fields(found_item_id, item_data)
+    except Exception:
+        pass
+
 def delete_found_item(found_item_id):
     """
     Delete a found item record.
@@ -918,6 +943,7 @@ def delete_found_item(found_item_id):
         
         # Delete the found item
         doc_ref.delete()
+        _invalidate_claim_item_cache(found_item_id)
         
         return True, {
             'success': True,
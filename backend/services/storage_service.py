@@ -45,6 +45,41 @@ def upload_image_to_storage(image_path, folder_name="found_items"):
         except Exception as fallback_err:
             return False, f"Failed to upload image (storage and fallback both failed): {str(e)} | Fallback error: {str(fallback_err)}"
 
+def upload_bytes_to_storage(image_bytes, folder_name="found_items", file_extension="png"):
+    """
+    Upload in-memory image bytes to Firebase Storage and return the public URL.
+    Same behavior as upload_image_to_storage, including the base64 data URL fallback,
+    without requiring the image to be written to disk first.
+
+    Args:
+        image_bytes: The encoded image data
+        folder_name: The folder name in storage (default: "found_items")
+        file_extension: Image format extension used for the blob name and content type
+
+    Returns:
+        tuple: (success: bool, url_or_error: str)
+    """
+    file_extension = (file_extension or 'png').lower()
+    content_type = f"image/{'jpeg' if file_extension in ['jpg', 'jpeg'] else file_extension}"
+
+    try:
+        bucket = get_storage_bucket()
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        unique_filename = f"{folder_name}/{timestamp}_{uuid.uuid4().hex[:8]}.{file_extension}"
+
+        blob = bucket.blob(unique_filename)
+        blob.upload_from_string(image_bytes, content_type=content_type)
+        blob.make_public()
+        return True, blob.public_url
+    except Exception as e:
+        # Fallback to base64 data URL if upload to storage fails
+        try:
+            import base64
+            b64 = base64.b64encode(image_bytes).decode('utf-8')
+            return True, f"data:{content_type};base64,{b64}"
+        except Exception as fallback_err:
+            return False, f"Failed to upload image (storage and fallback both failed): {str(e)} | Fallback error: {str(fallback_err)}"
+
 def delete_image_from_storage(image_url):
     """
     Delete an image from Firebase Storage using its URL